@@ -3,12 +3,14 @@
 import argparse
 import logging
 import sys
+import typing as t
 
 from advent import core
+from advent import year2021
 from advent import year2022
 from advent import year2023
 
-YEAR_PACKAGES = (year2022.MODULES, year2023.MODULES)
+YEAR_PACKAGES = (year2021.MODULES, year2022.MODULES, year2023.MODULES)
 
 logger = logging.getLogger(__name__)
 
@@ -34,6 +36,16 @@ def main() -> None:
         type=int,
     )
 
+    parser.add_argument(
+        "-i",
+        "--input",
+        dest="input",
+        default=sys.stdin,
+        type=argparse.FileType("r"),
+        help="Read the puzzle input from FILE instead of standard input",
+        metavar="FILE",
+    )
+
     parser.add_argument(
         "-v",
         "--verbose",
@@ -50,6 +62,42 @@ def main() -> None:
         help="Enable debug information",
     )
 
+    parser.add_argument(
+        "--log-sample",
+        dest="log_sample",
+        default=1,
+        type=int,
+        help="Only log one in every N info/debug records from each logger",
+        metavar="N",
+    )
+
+    parser.add_argument(
+        "--log-interval",
+        dest="log_interval",
+        default=0.0,
+        type=float,
+        help="Log at most one info/debug record per SECONDS from each logger",
+        metavar="SECONDS",
+    )
+
+    parser.add_argument(
+        "--timeout",
+        dest="timeout",
+        default=None,
+        type=float,
+        help="Stop the solution after SECONDS of wall clock time",
+        metavar="SECONDS",
+    )
+
+    parser.add_argument(
+        "--memory",
+        dest="memory",
+        default=None,
+        type=int,
+        help="Limit the address space of the solution to MB megabytes",
+        metavar="MB",
+    )
+
     # Extract day and part
     args = parser.parse_args()
 
@@ -58,6 +106,11 @@ def main() -> None:
     part: int = args.part
     logging_info: bool = args.info
     logging_debug: bool = args.debug
+    input_stream: t.TextIO = args.input
+    log_sample: int = args.log_sample
+    log_interval: float = args.log_interval
+    timeout: t.Optional[float] = args.timeout
+    memory: t.Optional[int] = args.memory
 
     # Debug flag overrides info flag
     logging_level = logging.WARNING
@@ -67,14 +120,23 @@ def main() -> None:
         logging_level = logging.DEBUG
 
     root_logger = logging.getLogger()
-    core.configure_logger(root_logger, level=logging_level)
+    core.configure_logger(
+        root_logger, level=logging_level, sample=log_sample, interval=log_interval
+    )
+
+    # Only isolate the solution if a limit was asked for
+    budget = None
+    if timeout is not None or memory is not None:
+        budget = core.Budget(
+            seconds=timeout, memory=None if memory is None else memory * 1024 * 1024
+        )
 
-    runner = core.Runner()
+    runner = core.Runner(default_budget=budget)
     for package in YEAR_PACKAGES:
         for module in package:
             runner.load_component(module.component)
     runner.run(
-        sys.stdin, sys.stdout, problem=core.ProblemID(year=year, day=day, part=part)
+        input_stream, sys.stdout, problem=core.ProblemID(year=year, day=day, part=part)
     )
 
 
@@ -1,9 +1,117 @@
 """Core utilities for Advent of Code."""
 
+import array
 import collections.abc as c
+import contextlib
 import dataclasses
+import io
+import itertools
 import logging
+import logging.handlers
+import mmap
+import multiprocessing
+import multiprocessing.connection
+import operator
+import os
+import queue
+import re
+import time
+import traceback
 import typing as t
+import weakref
+
+logger = logging.getLogger(__name__)
+
+
+class SamplingFilter(logging.Filter):
+    """Thin out chatty loggers in hot loops.
+
+    Lets through one in every `every` records from each logger,
+    and at most one record per `interval` seconds from each logger.
+    Records at WARNING or above are never dropped.
+    """
+
+    def __init__(self, every: int = 1, interval: float = 0.0) -> None:
+        """Initialize the filter with its sampling rate and minimum interval."""
+        super().__init__()
+        self.every = every
+        self.interval = interval
+        # Per logger name: records seen since the last one let through,
+        # and the creation time of the last one let through
+        self.skipped: t.Dict[str, int] = {}
+        self.last: t.Dict[str, float] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        """Decide whether a record should be emitted."""
+        if record.levelno >= logging.WARNING:
+            return True
+        skipped = self.skipped.get(record.name, self.every - 1) + 1
+        last = self.last.get(record.name)
+        if skipped < self.every or (
+            last is not None and record.created - last < self.interval
+        ):
+            self.skipped[record.name] = skipped
+            return False
+        self.skipped[record.name] = 0
+        self.last[record.name] = record.created
+        return True
+
+
+class BackgroundHandler(logging.handlers.QueueHandler):
+    """Hand records to a handler running on a background thread.
+
+    Message arguments are merged in the logging thread,
+    so later mutation of logged objects does not change the output,
+    but formatting and writing happen on the listener thread.
+    """
+
+    def __init__(self, handler: logging.Handler) -> None:
+        """Start a listener thread that feeds records to the given handler."""
+        records: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+        super().__init__(records)
+        self.listener = logging.handlers.QueueListener(
+            records, handler, respect_handler_level=True
+        )
+        self.listener.start()
+        self.listening = True
+        OPEN_HANDLERS.add(self)
+
+    def restart(self) -> None:
+        """Start a fresh listener thread on an empty queue, if this handler is open.
+
+        Records still queued were inherited from before a fork,
+        and are left for the parent process to write.
+        """
+        if self.listening:
+            records: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+            self.queue = records
+            self.listener = logging.handlers.QueueListener(
+                records, *self.listener.handlers, respect_handler_level=True
+            )
+            self.listener.start()
+
+    def close(self) -> None:
+        """Drain any queued records and stop the listener thread."""
+        # logging.shutdown closes every handler at exit, so this also runs then
+        if self.listening:
+            self.listener.stop()
+            self.listening = False
+            OPEN_HANDLERS.discard(self)
+        super().close()
+
+
+# Handlers whose listener threads need restarting in a forked child
+OPEN_HANDLERS: "weakref.WeakSet[BackgroundHandler]" = weakref.WeakSet()
+
+
+def restart_handlers() -> None:
+    """Restart every open BackgroundHandler, since threads do not survive a fork."""
+    for handler in list(OPEN_HANDLERS):
+        handler.restart()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=restart_handlers)
 
 
 # Adapted from HN67/nsapi
@@ -13,12 +121,20 @@ def configure_logger(
     level: t.Union[int, str] = logging.WARNING,
     format_string: t.Optional[str] = None,
     force: bool = True,
+    sample: int = 1,
+    interval: float = 0.0,
 ) -> logging.Logger:
     """Performs standard configuration on the provided logger.
 
     Can be used to configure this modules logger or any user modules logger.
 
-    Adds a default stream handler with a format string containing level, name, and message.
+    Adds a default stream handler with a format string containing level, name, and message,
+    run behind a BackgroundHandler so formatting and output happen off the calling thread.
+    If sample or interval are given, records below WARNING are thinned per logger
+    (see SamplingFilter).
+
+    Idempotent: if forced, a handler added by a previous call is replaced,
+    otherwise the handler is only added if none exist.
 
     Returns the logger passed.
     """
@@ -26,11 +142,21 @@ def configure_logger(
     if format_string is None:
         format_string = "[%(asctime)s] [%(levelname)s] %(name)s - %(message)s"
 
+    # Replace any handler we installed before, rather than stacking another
+    if force:
+        for existing in list(loggerObject.handlers):
+            if isinstance(existing, BackgroundHandler):
+                loggerObject.removeHandler(existing)
+                existing.close()
+
     # Add formatted handler
     # Only add the handler if forced or none exist
     if force or len(loggerObject.handlers) == 0:
-        handler = logging.StreamHandler()
-        handler.setFormatter(logging.Formatter(format_string))
+        stream = logging.StreamHandler()
+        stream.setFormatter(logging.Formatter(format_string))
+        handler = BackgroundHandler(stream)
+        if sample > 1 or interval > 0:
+            handler.addFilter(SamplingFilter(every=sample, interval=interval))
         loggerObject.addHandler(handler)
 
     # Set logging level
@@ -40,11 +166,335 @@ def configure_logger(
     return loggerObject
 
 
+def limit_logger(
+    loggerObject: logging.Logger, *, every: int = 1, interval: float = 0.0
+) -> logging.Logger:
+    """Sample the records logged directly to a logger, e.g. one logging in a hot loop.
+
+    Replaces any SamplingFilter previously attached to the logger.
+
+    Returns the logger passed.
+    """
+    for existing in list(loggerObject.filters):
+        if isinstance(existing, SamplingFilter):
+            loggerObject.removeFilter(existing)
+    loggerObject.addFilter(SamplingFilter(every=every, interval=interval))
+    return loggerObject
+
+
 def load_data(file: t.TextIO) -> c.Iterable[str]:
     """Read each line of input, stripping automatically."""
     return (line.strip() for line in file)
 
 
+# Inputs at least this many bytes are split up when read from a file
+PARALLEL_THRESHOLD = 1 << 24
+
+
+def parallel_path(
+    stream: t.IO[t.Any], threshold: int = PARALLEL_THRESHOLD
+) -> t.Optional[str]:
+    """Path of the file behind a stream, if it is large enough to split up.
+
+    Returns None for streams that are not regular files, such as stdin.
+    """
+    path = getattr(stream, "name", None)
+    if (
+        isinstance(path, str)
+        and os.path.isfile(path)
+        and os.path.getsize(path) >= threshold
+    ):
+        return path
+    return None
+
+
+# Raw input, either read into memory or mapped from a file
+Buffer = t.Union[bytes, mmap.mmap]
+
+
+@contextlib.contextmanager
+def load_bytes(stream: t.TextIO) -> c.Iterator[Buffer]:
+    """Provide the whole input as bytes, without decoding it line by line.
+
+    Non-empty regular files are memory mapped instead of read,
+    other streams such as stdin are read and encoded.
+    """
+    path = parallel_path(stream, threshold=1)
+    if path is None:
+        yield stream.read().encode()
+        return
+    with map_file(path) as buffer:
+        yield buffer
+
+
+@contextlib.contextmanager
+def map_file(path: str) -> c.Iterator[mmap.mmap]:
+    """Memory map a non-empty file for reading."""
+    with open(path, "rb") as file:
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            yield buffer
+
+
+def seek_line(file: t.BinaryIO, position: int) -> int:
+    """Move to the first line of a file starting at or after a position."""
+    # A line straddling position belongs to the previous chunk
+    if position > 0:
+        file.seek(position - 1)
+        if file.read(1) != b"\n":
+            file.readline()
+    else:
+        file.seek(0)
+    return file.tell()
+
+
+def read_lines(file: t.BinaryIO, start: int, end: int) -> bytes:
+    """Read the lines of a file that start within the byte range [start, end)."""
+    position = seek_line(file, start)
+    if position >= end:
+        return b""
+    data = file.read(end - position)
+    # Finish the line straddling end, it belongs to this chunk
+    if not data.endswith(b"\n"):
+        data += file.readline()
+    return data
+
+
+def read_chunk(path: str, start: int, end: int) -> bytes:
+    """Read the lines of a file that start within the byte range [start, end).
+
+    Splitting a file at any byte offsets gives chunks that cover each line once.
+    """
+    with open(path, "rb") as file:
+        return read_lines(file, start, end)
+
+
+def previous_line(file: t.BinaryIO, position: int, block: int = 1 << 12) -> bytes:
+    """Read the line ending just before a position at the start of a line."""
+    data = b""
+    while position > 0:
+        step = min(block, position)
+        position -= step
+        file.seek(position)
+        data = file.read(step) + data
+        # Skip the newline ending the line itself
+        newline = data.rfind(b"\n", 0, len(data) - 1)
+        if newline >= 0:
+            return data[newline + 1 :]
+    return data
+
+
+def read_halo_chunk(path: str, start: int, end: int) -> t.Tuple[bytes, bytes, bytes]:
+    """Read a chunk as read_chunk does, with the non-blank lines around it.
+
+    Returns the line before the chunk, the chunk, and the line after it,
+    where a missing line is empty.
+    """
+    with open(path, "rb") as file:
+        data = read_lines(file, start, end)
+        if not data:
+            return b"", b"", b""
+        first = file.tell() - len(data)
+        below = next((line for line in file if line.strip()), b"")
+        above = b""
+        while first > 0 and not above.strip():
+            above = previous_line(file, first)
+            first -= len(above)
+        return above, data, below
+
+
+UNSIGNED_INTEGER = re.compile(rb"\d+")
+SIGNED_INTEGER = re.compile(rb"-?\d+")
+# Maps digits to '1' and everything else but line endings to ' ',
+# so each integer becomes a run of ones starting a line or after a space
+DIGIT_RUNS = bytes(
+    ord("1") if byte in b"0123456789" else byte if byte in b"\r\n" else ord(" ")
+    for byte in range(256)
+)
+
+
+def extract_integers(data: bytes, signed: bool = False) -> "array.array[int]":
+    """Extract every integer in a buffer, in order, in a single pass.
+
+    Anything that is not a digit separates integers.
+    A leading '-' is only treated as a sign if signed is True,
+    since it is more often a separator (e.g. '2-4') in puzzle inputs.
+    """
+    pattern = SIGNED_INTEGER if signed else UNSIGNED_INTEGER
+    return array.array("q", map(int, pattern.findall(data)))
+
+
+@dataclasses.dataclass(frozen=True)
+class IntegerLines:
+    """Integers extracted from each line of a buffer.
+
+    values holds every integer in order,
+    and line i holds values[offsets[i]:offsets[i + 1]].
+    """
+
+    values: "array.array[int]"
+    offsets: "array.array[int]"
+
+    @classmethod
+    def extract(cls, data: bytes, signed: bool = False) -> "IntegerLines":
+        """Extract the integers of each line in a buffer.
+
+        The values come from a single scan of the whole buffer.
+        The offsets come from counting the runs of digits on each line
+        with bytes methods, with no per-line regex.
+        """
+        values = extract_integers(data, signed=signed)
+        lines = data.translate(DIGIT_RUNS).splitlines()
+        counts = map(
+            operator.add,
+            map(bytes.count, lines, itertools.repeat(b" 1")),
+            map(bytes.startswith, lines, itertools.repeat(b"1")),
+        )
+        offsets = array.array("q", itertools.accumulate(counts, initial=0))
+        return cls(values=values, offsets=offsets)
+
+    def __len__(self) -> int:
+        """Number of lines."""
+        return len(self.offsets) - 1
+
+    def line(self, index: int) -> "array.array[int]":
+        """The integers of a single line."""
+        return self.values[self.offsets[index] : self.offsets[index + 1]]
+
+    def __iter__(self) -> c.Iterator["array.array[int]"]:
+        """The integers of each line."""
+        return (self.line(index) for index in range(len(self)))
+
+
+# (row, column) location in a grid
+Coord = t.Tuple[int, int]
+
+# Offsets of the eight surrounding cells, orthogonal ones first
+ORTHOGONAL = ((-1, 0), (0, -1), (0, 1), (1, 0))
+DIAGONAL = ((-1, -1), (-1, 1), (1, -1), (1, 1))
+
+GS = t.TypeVar("GS", bound="Grid")
+
+
+@dataclasses.dataclass(frozen=True)
+class Grid:
+    """Dense two dimensional grid of integers.
+
+    Cells are stored row-major in a single flat array,
+    so lookups are plain index arithmetic instead of hashing coordinates.
+    """
+
+    width: int
+    height: int
+    cells: "array.array[int]"
+
+    def __post_init__(self) -> None:
+        """Check that the backing array matches the dimensions."""
+        if len(self.cells) != self.width * self.height:
+            raise ValueError(
+                f"Grid of {self.width}x{self.height} cannot hold {len(self.cells)} cells"
+            )
+
+    @classmethod
+    def filled(
+        cls: t.Type[GS], width: int, height: int, value: int = 0, typecode: str = "q"
+    ) -> GS:
+        """Create a grid with every cell set to the same value."""
+        return cls(
+            width=width,
+            height=height,
+            cells=array.array(typecode, [value]) * (width * height),
+        )
+
+    @classmethod
+    def from_rows(
+        cls: t.Type[GS], rows: c.Iterable[c.Iterable[int]], typecode: str = "q"
+    ) -> GS:
+        """Create a grid from rows of integers.
+
+        Raises a ValueError if the rows are not all the same length.
+        """
+        cells = array.array(typecode)
+        width = 0
+        height = 0
+        for row in rows:
+            before = len(cells)
+            cells.extend(row)
+            if height == 0:
+                width = len(cells)
+            elif len(cells) - before != width:
+                raise ValueError(f"Row {height} does not have width {width}")
+            height += 1
+        return cls(width=width, height=height, cells=cells)
+
+    @classmethod
+    def from_lines(cls: t.Type[GS], lines: c.Iterable[str]) -> GS:
+        """Create a grid of character codes from lines of text.
+
+        Each line becomes a row in a single bulk copy, one byte per character.
+
+        Raises a ValueError if the lines are not all the same length.
+        """
+        encoded = [line.encode() for line in lines]
+        width = len(encoded[0]) if encoded else 0
+        for row, line in enumerate(encoded):
+            if len(line) != width:
+                raise ValueError(f"Line {row} does not have width {width}")
+        return cls(
+            width=width,
+            height=len(encoded),
+            cells=array.array("B", b"".join(encoded)),
+        )
+
+    def index(self, coord: Coord) -> int:
+        """Flat index of a coordinate in the backing array."""
+        return coord[0] * self.width + coord[1]
+
+    def __contains__(self, coord: Coord) -> bool:
+        """Whether a coordinate lies inside the grid."""
+        return 0 <= coord[0] < self.height and 0 <= coord[1] < self.width
+
+    def __getitem__(self, coord: Coord) -> int:
+        """Value of the cell at a coordinate."""
+        return self.cells[coord[0] * self.width + coord[1]]
+
+    def __setitem__(self, coord: Coord, value: int) -> None:
+        """Set the value of the cell at a coordinate."""
+        self.cells[coord[0] * self.width + coord[1]] = value
+
+    def row(self, row: int) -> "array.array[int]":
+        """Copy of a single row."""
+        return self.cells[row * self.width : (row + 1) * self.width]
+
+    def rows(self) -> c.Iterable["array.array[int]"]:
+        """Copies of each row, top to bottom."""
+        return (self.row(row) for row in range(self.height))
+
+    def column(self, column: int) -> "array.array[int]":
+        """Copy of a single column."""
+        return self.cells[column :: self.width]
+
+    def columns(self) -> c.Iterable["array.array[int]"]:
+        """Copies of each column, left to right."""
+        return (self.column(column) for column in range(self.width))
+
+    def neighbors(self, coord: Coord, diagonal: bool = True) -> c.Iterable[Coord]:
+        """The in bounds coordinates surrounding a coordinate.
+
+        Includes diagonal neighbours unless diagonal is False.
+        """
+        offsets = ORTHOGONAL + DIAGONAL if diagonal else ORTHOGONAL
+        row, col = coord
+        return (
+            (row + d_row, col + d_col)
+            for d_row, d_col in offsets
+            if 0 <= row + d_row < self.height and 0 <= col + d_col < self.width
+        )
+
+    def copy(self: GS) -> GS:
+        """Create an independent copy of this grid."""
+        return type(self)(width=self.width, height=self.height, cells=self.cells[:])
+
+
 # Type aliases
 @dataclasses.dataclass(frozen=True)
 class ProblemID:
@@ -82,21 +532,123 @@ class Component:
         return decorator
 
 
+@dataclasses.dataclass(frozen=True)
+class Budget:
+    """Resource limits for running a solution.
+
+    seconds bounds wall clock time and memory bounds address space in bytes;
+    None leaves that resource unlimited.
+    """
+
+    seconds: t.Optional[float] = None
+    memory: t.Optional[int] = None
+
+
+@dataclasses.dataclass(frozen=True)
+class BudgetExceeded:
+    """Report of a solution that was stopped for exceeding its budget."""
+
+    problem: ProblemID
+    # Which limit was hit, "time" or "memory"
+    resource: str
+    # Wall clock seconds and peak resident set size (bytes) reached before stopping
+    elapsed: float
+    peak_rss: int
+
+    def __str__(self) -> str:
+        """Human readable report."""
+        return (
+            f"Budget exceeded for {self.problem.year} day {self.problem.day}"
+            f" part {self.problem.part}: {self.resource}"
+            f" (ran {self.elapsed:.3f}s, peak RSS {self.peak_rss // 1024} KiB)"
+        )
+
+
+def peak_rss(pid: t.Optional[int] = None) -> int:
+    """Peak resident set size in bytes of a process, this one by default.
+
+    Read from /proc, so returns 0 where that is not available.
+    """
+    try:
+        with open(f"/proc/{pid or 'self'}/status", encoding="ascii") as status:
+            for line in status:
+                if line.startswith("VmHWM:"):
+                    # Reported in kB
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return 0
+
+
+def run_limited(
+    solution: Solution,
+    text: t.Optional[str],
+    path: t.Optional[str],
+    memory: t.Optional[int],
+    connection: "multiprocessing.connection.Connection",
+) -> None:
+    """Run a solution in a child process under a memory limit.
+
+    The input is the file at path if given, otherwise text.
+
+    Sends back ("done", output, peak rss), ("memory", peak rss),
+    or ("error", formatted traceback).
+    """
+    try:
+        if memory is not None:
+            # Unix only, so imported when actually needed
+            import resource  # pylint: disable=import-outside-toplevel
+
+            resource.setrlimit(resource.RLIMIT_AS, (memory, memory))
+        output = io.StringIO()
+        try:
+            # Reopening the file keeps path based fast paths such as mmap working
+            if path is not None:
+                with open(path) as input_stream:
+                    solution(input_stream, output)
+            else:
+                solution(io.StringIO(text), output)
+        except MemoryError:
+            connection.send(("memory", peak_rss()))
+        except Exception:  # pylint: disable=broad-except
+            connection.send(("error", traceback.format_exc()))
+        else:
+            connection.send(("done", output.getvalue(), peak_rss()))
+    finally:
+        connection.close()
+        # The process exits without running atexit hooks, so flush logging here
+        logging.shutdown()
+
+
 class Runner:
     """Collects and runs Advent of Code solutions."""
 
-    def __init__(self) -> None:
-        """Initalize runner."""
+    def __init__(self, default_budget: t.Optional[Budget] = None) -> None:
+        """Initalize runner.
+
+        Problems without their own budget use the default budget, if any.
+        """
         self.solutions: t.MutableMapping[ProblemID, Solution] = {}
+        self.budgets: t.MutableMapping[ProblemID, Budget] = {}
+        self.default_budget = default_budget
 
     def load_component(self, component: Component) -> None:
         """Collect solutions held in a Component."""
         self.solutions.update(component.solutions)
 
+    def set_budget(self, problem: ProblemID, budget: Budget) -> None:
+        """Limit the resources a specific problem may use."""
+        self.budgets[problem] = budget
+
     def run(
         self, input_stream: t.TextIO, output_stream: t.TextIO, *, problem: ProblemID
-    ) -> None:
-        """Run the requested solution using the given communication channels."""
+    ) -> t.Optional[BudgetExceeded]:
+        """Run the requested solution using the given communication channels.
+
+        A solution with a budget is run in an isolated child process,
+        and stopped if it exceeds the budget;
+        the report is written to the output stream and returned.
+        """
 
         # Lookup the solution function, handling non existance
         try:
@@ -107,7 +659,81 @@ class Runner:
                 file=output_stream,
             )
             # Early return to be safe
-            return
-        else:
+            return None
+
+        budget = self.budgets.get(problem, self.default_budget)
+        if budget is None:
             # Run the solution, inheriting communication channels
             solution(input_stream, output_stream)
+            return None
+
+        exceeded = self.run_isolated(
+            solution, input_stream, output_stream, problem=problem, budget=budget
+        )
+        if exceeded is not None:
+            print(exceeded, file=output_stream)
+        return exceeded
+
+    @staticmethod
+    def run_isolated(
+        solution: Solution,
+        input_stream: t.TextIO,
+        output_stream: t.TextIO,
+        *,
+        problem: ProblemID,
+        budget: Budget,
+    ) -> t.Optional[BudgetExceeded]:
+        """Run a solution in a child process, enforcing a budget.
+
+        Input from a regular file is reopened by path in the child,
+        any other input is read up front and handed over.
+        The output is only written if the solution finishes.
+        Exceptions raised by the solution are re-raised as a RuntimeError.
+        """
+        path = parallel_path(input_stream, threshold=1)
+        text = input_stream.read() if path is None else None
+        receiver, sender = multiprocessing.Pipe(duplex=False)
+        process = multiprocessing.Process(
+            target=run_limited,
+            args=(solution, text, path, budget.memory, sender),
+            daemon=True,
+        )
+        start = time.perf_counter()
+        process.start()
+        # Close our copy of the sending end so a dead child reads as EOF
+        sender.close()
+
+        try:
+            finished = receiver.poll(budget.seconds)
+            elapsed = time.perf_counter() - start
+            if not finished:
+                rss = peak_rss(process.pid)
+                process.kill()
+                return BudgetExceeded(problem, "time", elapsed, rss)
+            try:
+                message = receiver.recv()
+            except EOFError:
+                # Killed without reporting back, e.g. by the OOM killer
+                process.join()
+                if budget.memory is not None and (process.exitcode or 0) < 0:
+                    return BudgetExceeded(problem, "memory", elapsed, 0)
+                raise RuntimeError(
+                    f"Solution process exited with code {process.exitcode}"
+                ) from None
+        finally:
+            process.join()
+            receiver.close()
+
+        match message:
+            case ("done", output, rss):
+                logger.info("Finished in %.3fs, peak RSS %s bytes", elapsed, rss)
+                output_stream.write(output)
+                return None
+            case ("memory", rss):
+                return BudgetExceeded(problem, "memory", elapsed, rss)
+            case ("error", formatted):
+                raise RuntimeError(f"Solution raised an exception:\n{formatted}")
+            case _:
+                raise RuntimeError(
+                    f"Unexpected message from solution process: {message}"
+                )
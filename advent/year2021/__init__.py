@@ -0,0 +1,21 @@
+"""Year 2021 Solutions."""
+
+from . import day1
+from . import day2
+from . import day3
+from . import day4
+from . import day5
+from . import day6
+from . import day7
+from . import day8
+
+MODULES = (
+    day1,
+    day2,
+    day3,
+    day4,
+    day5,
+    day6,
+    day7,
+    day8,
+)
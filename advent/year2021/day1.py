@@ -1,91 +1,65 @@
 """Solution to Day 1 of AoC."""
 
-import abc
-import collections
+import array
 import collections.abc as c
-import functools
+import itertools
 import operator
 import typing as t
-import sys
 
 from . import core
 
-S = t.TypeVar("S")
+# Define component to be imported by main
+component = core.Component()
 
 
-class Comparable(t.Protocol):
-    """Protocol for types that implement less than."""
+def window_increases(
+    depths: c.Iterable[int], window_sizes: c.Iterable[int], chunk_size: int = 1 << 16
+) -> c.Mapping[int, int]:
+    """Count the increasing sliding window sums for several window sizes at once.
 
-    @abc.abstractmethod
-    def __lt__(self: S, other: S) -> bool:
-        """True if and only if self < other."""
+    Consecutive windows of size w share all but one term,
+    so window i + 1 beats window i exactly when depths[i + w] > depths[i];
+    no sums are needed.
 
-
-class Addable(t.Protocol):
-    """Protocol for types that implement addition."""
-
-    @abc.abstractmethod
-    def __add__(self: S, other: S) -> S:
-        """Return self + other."""
-
-
-CT = t.TypeVar("CT", bound=Comparable)
-T = t.TypeVar("T")
-
-
-def increases(measures: c.Iterable[T], key: t.Callable[[T], CT]) -> int:
-    """Calculate the number of increasing measurements."""
-    last: t.Optional[CT] = None
-    count = 0
-    for measure in measures:
-        keyed = key(measure)
-        if last is not None and last < keyed:
-            count += 1
-        last = keyed
-    return count
-
-
-AT = t.TypeVar("AT", bound=Addable)
-
-
-def compress_sliding_windows(
-    values: c.Iterable[AT], window_size: int = 1
-) -> c.Iterable[AT]:
-    """Compute the iterable of sums of sliding windows.
-
-    Acts as an identity function (under ==) when window_size = 1.
-
-    Returns an empty iterable if there are not enough values to fill a window.
-    """
-    window: collections.deque[AT] = collections.deque(maxlen=window_size)
-    for value in values:
-        window.append(value)
-        # we don't want to start yielding until full window
-        if len(window) == window_size:
-            # sum is too concrete to use effectively
-            # omitting a initial makes it use 0
-            yield functools.reduce(operator.add, window)
-
-
-def part_one() -> None:
-    """Entrypoint for solver.
-
-    Handles input and output.
+    Consumes the depths in a single pass, chunk by chunk,
+    holding only a chunk plus the largest window in memory.
     """
-    count = increases((line.strip() for line in sys.stdin), int)
-    print(f"Increases: {count}")
-
-
-def part_two() -> None:
-    """Entrypoint for part two.
-
-    Handles input and output.
-    """
-    converted: t.Iterable[int] = map(int, (line.strip() for line in sys.stdin))
-    count = increases(compress_sliding_windows(converted, 3), int)
-    print(f"Sliding Increases: {count}")
-
-
-# Main entrypoint
-if __name__ == "__main__":
-    core.cmd(1, part_one, part_two)
+    sizes = sorted(set(window_sizes))
+    if len(sizes) == 0:
+        return {}
+    if sizes[0] < 1:
+        raise ValueError(f"Window sizes must be positive, got {sizes[0]}")
+    longest = sizes[-1]
+
+    counts = dict.fromkeys(sizes, 0)
+    values = iter(depths)
+    # The tail of the previous chunk, needed to compare across chunk boundaries
+    carry: "array.array[int]" = array.array("q")
+    while True:
+        chunk = carry + array.array("q", itertools.islice(values, chunk_size))
+        if len(chunk) == len(carry):
+            break
+        for size in sizes:
+            # Only compare pairs whose later element is new in this chunk
+            start = max(len(carry) - size, 0)
+            counts[size] += sum(
+                map(operator.lt, chunk[start : len(chunk) - size], chunk[start + size :])
+            )
+        carry = chunk[-longest:]
+    return counts
+
+
+@component.hook(1, 1, year=2021)
+def one(input_stream: t.TextIO, output_stream: t.TextIO) -> None:
+    """Day 1 Part 1 solution."""
+    depths = map(int, core.load_data(input_stream))
+    count = window_increases(depths, [1])[1]
+    print(f"Increases: {count}", file=output_stream)
+
+
+@component.hook(1, 2, year=2021)
+def two(input_stream: t.TextIO, output_stream: t.TextIO) -> None:
+    """Day 1 Part 2 solution."""
+    depths = map(int, core.load_data(input_stream))
+    count = window_increases(depths, [3])[3]
+    print(f"Sliding Increases: {count}", file=output_stream)
@@ -1,27 +1,22 @@
 """Solution to Day 2 of AoC."""
 
-import abc
-import collections.abc as c
+import array
+import concurrent.futures
 import dataclasses
 import functools
+import itertools
 import logging
-import sys
+import operator
+import os
+import re
 import typing as t
 
 from . import core
 
 logger = logging.getLogger(__name__)
 
-SU = t.TypeVar("SU", bound="Updatable")
-
-
-class Updatable(t.Protocol):
-    """Type that can respond to commands."""
-
-    @abc.abstractmethod
-    def update(self: SU, action: str, value: int) -> SU:
-        """Create the result of a command."""
-
+# Define component to be imported by main
+component = core.Component()
 
 SP = t.TypeVar("SP", bound="Position")
 
@@ -40,18 +35,6 @@ class Position:
             depth=self.depth + other.depth,
         )
 
-    def update(self: SP, action: str, value: int) -> SP:
-        """Create the position resulting from a move from this position."""
-        match action:
-            case "forward":
-                return self + Position(horizontal=value, depth=0)
-            case "down":
-                return self + Position(horizontal=0, depth=value)
-            case "up":
-                return self + Position(horizontal=0, depth=-value)
-            case _:
-                raise ValueError(f"Action '{action}' is not recognized.")
-
 
 SS = t.TypeVar("SS", bound="State")
 
@@ -69,61 +52,143 @@ class State:
             position=self.position + other.position, aim=self.aim + other.aim
         )
 
-    def update(self: SS, action: str, value: int) -> SS:
-        """Create the position resulting from a move from this position."""
-        match action:
-            case "forward":
-                return self + State(
-                    position=Position(horizontal=value, depth=self.aim * value),
-                    aim=0,
-                )
-            case "down":
-                return self + State(position=Position(0, 0), aim=value)
-            case "up":
-                return self + State(position=Position(0, 0), aim=-value)
-            case _:
-                raise ValueError(f"Action '{action}' is not recognized.")
 
+@dataclasses.dataclass(frozen=True)
+class Transform:
+    """Net effect of a run of commands on a State.
 
-def apply_movement(initial: SU, delta: tuple[str, int]) -> SU:
-    """Functionally apply a delta onto a Updatable."""
-    new = initial.update(delta[0], delta[1])
-    logger.info(new)
-    return new
+    Starting from horizontal h, depth d and aim a,
+    the commands lead to horizontal h + horizontal,
+    depth d + depth + a * horizontal and aim a + aim.
+    This is an affine map, so transforms of consecutive runs compose associatively.
+    """
 
+    horizontal: int = 0
+    depth: int = 0
+    aim: int = 0
 
-def chart(commands: c.Iterable[tuple[str, int]], initial: SU) -> SU:
-    """Chart the resulting position based on provided commands."""
-    return functools.reduce(apply_movement, commands, initial)
+    def then(self, later: "Transform") -> "Transform":
+        """The transform of these commands followed by the later ones."""
+        return Transform(
+            horizontal=self.horizontal + later.horizontal,
+            depth=self.depth + later.depth + self.aim * later.horizontal,
+            aim=self.aim + later.aim,
+        )
 
+    def apply(self, state: State) -> State:
+        """The state reached by running these commands from the given state."""
+        return State(
+            position=Position(
+                horizontal=state.position.horizontal + self.horizontal,
+                depth=state.position.depth + self.depth + state.aim * self.horizontal,
+            ),
+            aim=state.aim + self.aim,
+        )
 
-def parse_components(pieces: c.Sequence[str]) -> tuple[str, int]:
-    """Parse the compoenents of a line into a proper pair."""
-    return (pieces[0], int(pieces[1]))
 
+# First letter of each command, validated against the known actions
+ACTION_LETTER = re.compile(rb"(?m)^[ \t]*(?=(?:forward|down|up)[ \t])(\w)")
+# Per action letter, the multiplier of the value that moves forward / changes aim
+FORWARD = bytes.maketrans(b"fdu", b"\x01\x00\x00")
+AIM = bytes.maketrans(b"fdu", b"\x00\x01\xff")
+
+
+@dataclasses.dataclass(frozen=True)
+class Commands:
+    """Commands encoded as parallel integer arrays.
+
+    forward[i] is how far command i moves forward,
+    and aim[i] is how much it changes the aim (or depth, without aim).
+    """
+
+    forward: "array.array[int]"
+    aim: "array.array[int]"
+
+    @classmethod
+    def encode(cls, data: bytes) -> "Commands":
+        """Encode a buffer of commands.
+
+        Uses whole buffer scans, with no per-command parsing in Python.
+        """
+        values = core.extract_integers(data)
+        actions = b"".join(ACTION_LETTER.findall(data))
+        if len(actions) != len(values):
+            raise ValueError("Commands contain an action that is not recognized.")
+        # Read the aim multipliers back as signed bytes so 0xff is -1
+        forwards = actions.translate(FORWARD)
+        aims = array.array("b", actions.translate(AIM))
+        return cls(
+            forward=array.array("q", map(operator.mul, values, forwards)),
+            aim=array.array("q", map(operator.mul, values, aims)),
+        )
 
-def load_commands() -> t.Iterable[tuple[str, int]]:
-    """Load commands from standard input."""
-    return (parse_components(line.strip().split(" ")) for line in sys.stdin)
+    def position(self) -> Position:
+        """The position reached by treating up/down as moving depth."""
+        return Position(horizontal=sum(self.forward), depth=sum(self.aim))
+
+    def transform(self) -> Transform:
+        """The net effect of these commands, treating up/down as changing aim.
+
+        The aim is the running sum of up/down,
+        and each forward dives by the current aim times its distance.
+        """
+        aims = itertools.accumulate(self.aim)
+        return Transform(
+            horizontal=sum(self.forward),
+            depth=sum(map(operator.mul, self.forward, aims)),
+            aim=sum(self.aim),
+        )
 
+    def state(self) -> State:
+        """The state reached from the origin, treating up/down as changing aim."""
+        return self.transform().apply(State(position=Position(0, 0), aim=0))
 
-def display_result(destination: Position) -> None:
-    """Format display the resulting destination."""
-    print(f"Destination: {destination}")
-    product = destination.horizontal * destination.depth
-    print(f"Product: {product}")
 
+def chunk_transform(path: str, start: int, end: int) -> Transform:
+    """Reduce the commands starting within a byte range of a file to a Transform."""
+    return Commands.encode(core.read_chunk(path, start, end)).transform()
 
-def part_one() -> None:
-    """Solve part one of day 2."""
-    display_result(chart(load_commands(), initial=Position(0, 0)))
 
+def parallel_transform(path: str, workers: t.Optional[int] = None) -> Transform:
+    """Reduce a command file to a Transform across worker processes.
 
-def part_two() -> None:
-    """Solve part two of day 2."""
-    display_result(chart(load_commands(), initial=State(Position(0, 0), 0)).position)
+    The file is split into one byte range per worker,
+    each range is reduced independently,
+    and the small summaries are composed in order.
+    chunk_transform only needs the path and range,
+    so ranges could just as well be reduced on other machines.
+    """
+    size = os.path.getsize(path)
+    workers = workers or os.cpu_count() or 1
+    bounds = [size * index // workers for index in range(workers + 1)]
+    with concurrent.futures.ProcessPoolExecutor(workers) as executor:
+        transforms = executor.map(
+            chunk_transform, itertools.repeat(path), bounds[:-1], bounds[1:]
+        )
+        return functools.reduce(Transform.then, transforms, Transform())
 
 
-if __name__ == "__main__":
-    core.configure_logger(logger, level=logging.INFO)
-    core.cmd(2, part_one, part_two)
+def display_result(destination: Position, output_stream: t.TextIO) -> None:
+    """Format display the resulting destination."""
+    print(f"Destination: {destination}", file=output_stream)
+    product = destination.horizontal * destination.depth
+    print(f"Product: {product}", file=output_stream)
+
+
+@component.hook(2, 1, year=2021)
+def one(input_stream: t.TextIO, output_stream: t.TextIO) -> None:
+    """Day 2 Part 1 solution."""
+    commands = Commands.encode(input_stream.read().encode())
+    display_result(commands.position(), output_stream)
+
+
+@component.hook(2, 2, year=2021)
+def two(input_stream: t.TextIO, output_stream: t.TextIO) -> None:
+    """Day 2 Part 2 solution."""
+    # Large files can be split up and reduced in parallel
+    path = core.parallel_path(input_stream)
+    if path is not None:
+        state = parallel_transform(path).apply(State(position=Position(0, 0), aim=0))
+    else:
+        state = Commands.encode(input_stream.read().encode()).state()
+    display_result(state.position, output_stream)
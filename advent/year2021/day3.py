@@ -1,157 +1,138 @@
 """Solution for Day 3 of AoC."""
 
+import bisect
 import collections.abc as c
 import dataclasses
 import logging
-import sys
 import typing as t
 
 from . import core
 
 logger = logging.getLogger(__name__)
 
+# Define component to be imported by main
+component = core.Component()
 
-@dataclasses.dataclass()
-class Counter:
-    """Keep track of a number of zeroes and ones."""
 
-    zeroes: int = 0
-    ones: int = 0
+@dataclasses.dataclass(frozen=True)
+class Report:
+    """A diagnostic report as one flat buffer of equal width rows of bits."""
 
-    def digest(self, string: str, suppress: bool = False) -> "Counter":
-        """Digest a string of ones and zeroes.
+    bits: bytes
+    width: int
 
-        Mutates and returns this Counter.
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "Report":
+        """Parse a diagnostic report of whitespace separated binary numbers.
 
-        If suppress is True, ignores characters
-        that are not '0' or '1',
-        otherwise throws a ValueError.
+        Raises a ValueError if the rows are not the same width
+        or contain anything but '0' and '1'.
         """
-        for char in string:
-            if char == "0":
-                self.zeroes += 1
-            elif char == "1":
-                self.ones += 1
-            elif not suppress:
-                raise ValueError(
-                    f"String passed to digest contains non-bit char '{char}'"
-                )
-        return self
-
-    def frequency(self) -> tuple[bool, bool]:
-        """Return the less common and most common value.
-
-        Returns (false, true) if both are equal.
+        rows = data.split()
+        width = len(rows[0]) if rows else 0
+        if len(set(map(len, rows))) > 1:
+            raise ValueError("Diagnostic report rows are not all the same width")
+        bits = b"".join(rows)
+        if len(bits.translate(None, b"01")) > 0:
+            raise ValueError("Diagnostic report contains non-bit characters")
+        return cls(bits=bits, width=width)
+
+    def __len__(self) -> int:
+        """Number of rows."""
+        return len(self.bits) // self.width if self.width > 0 else 0
+
+    def values(self) -> c.Iterable[int]:
+        """Each row as an integer."""
+        return (
+            int(self.bits[start : start + self.width], base=2)
+            for start in range(0, len(self.bits), self.width)
+        )
+
+    def ones(self) -> c.Sequence[int]:
+        """Count the ones in each column, most significant column first.
+
+        Each column is a strided slice of the buffer, counted in one call.
         """
-        freq = (self.ones < self.zeroes, self.ones >= self.zeroes)
-        logger.debug("Counter: %s | %s", self, freq)
-        return freq
-
-
-@dataclasses.dataclass()
-class Parser:
-    """Consumes diagnostic output."""
-
-    # data[0] is data on bit 0
-    # so note that this is opposite order of standard
-    # representation of binary
-    data: c.MutableSequence[Counter] = dataclasses.field(default_factory=list)
-
-    def digest(self, string: str, suppress: bool = False) -> "Parser":
-        """Digest a line of diagnostic output."""
-        # reverse the string so we consume bits in little-endian order
-        for index, char in enumerate(reversed(string)):
-            try:
-                self.data[index].digest(char, suppress=suppress)
-            except IndexError as e:
-                if index == len(self.data):
-                    self.data.append(Counter().digest(char, suppress=suppress))
-                else:
-                    raise IndexError(
-                        "Something terrible has happened and a index was skipped."
-                    ) from e
-        logger.debug(self.data)
-        return self
-
-    def extract(self, index: int) -> t.Iterable[bool]:
-        """Calculate an extracted row,
-        either min (0) or max (1).
-        """
-        return (d.frequency()[index] for d in self.data)
-
-    def gamma_raw(self) -> t.Iterable[bool]:
-        """Calculate the raw gamma rate."""
-        return self.extract(1)
+        return [
+            self.bits[column :: self.width].count(b"1") for column in range(self.width)
+        ]
 
-    def epsilon_raw(self) -> t.Iterable[bool]:
-        """Calculate the raw epsilon rate."""
-        return self.extract(0)
+    def gamma(self) -> int:
+        """The gamma rate, made of the most common bit of each column.
 
-    @staticmethod
-    def format_value(bits: t.Iterable[bool]) -> str:
-        """Convert a iterable of bits into a big-endian string."""
-        return "".join(reversed(["1" if bit else "0" for bit in bits]))
+        Ties count as a one.
+        """
+        rows = len(self)
+        return int(
+            "".join("1" if ones * 2 >= rows else "0" for ones in self.ones()) or "0",
+            base=2,
+        )
 
-    def gamma(self) -> str:
-        """Calculate the formatted gamma rate."""
-        return Parser.format_value(self.gamma_raw())
+    def epsilon(self) -> int:
+        """The epsilon rate, made of the least common bit of each column.
 
-    def epsilon(self) -> str:
-        """Calculate the formatted gamma rate."""
-        return Parser.format_value(self.epsilon_raw())
+        Since ties count as a zero, this is exactly the complement of gamma.
+        """
+        return self.gamma() ^ ((1 << self.width) - 1)
 
 
-def parse_lines(lines: t.Iterable[str]) -> Parser:
-    """Return the (gamma, epsilon) values of the given lines"""
-    parser = Parser()
-    for line in lines:
-        parser.digest(line)
-    return parser
+@component.hook(3, 1, year=2021)
+def one(input_stream: t.TextIO, output_stream: t.TextIO) -> None:
+    """Day 3 Part 1 solution."""
+    report = Report.from_bytes(input_stream.read().encode())
+    gamma = report.gamma()
+    epsilon = report.epsilon()
+    gamma_string = format(gamma, f"0{report.width}b")
+    epsilon_string = format(epsilon, f"0{report.width}b")
+    print(f"Gamma:   {gamma_string} ({gamma})", file=output_stream)
+    print(f"Epsilon: {epsilon_string} ({epsilon})", file=output_stream)
+    print(f"Power Consumption: {gamma*epsilon}", file=output_stream)
 
 
-def part_one() -> None:
-    """Solve part one."""
-    parser = parse_lines(core.load_data(sys.stdin))
-    gamma_string = parser.gamma()
-    epsilon_string = parser.epsilon()
-    gamma = int(gamma_string, base=2)
-    epsilon = int(epsilon_string, base=2)
-    print(f"Gamma:   {gamma_string} ({gamma})")
-    print(f"Epsilon: {epsilon_string} ({epsilon})")
-    print(f"Power Consumption: {gamma*epsilon}")
+def select_rating(values: c.Sequence[int], width: int, most_common: bool) -> int:
+    """Find a rating by filtering on progressive bits, most significant first.
 
+    values must be sorted. The lines still in play always share their high bits,
+    so they are a contiguous run of values,
+    and each bit step is a single bisection of that run, with no copying.
+    Keeps the most common bit (ties keep 1) or the least common (ties keep 0);
+    if every remaining line has the same bit, they are all kept.
 
-def filter_lines(lines: t.Iterable[str], frequency_index: int) -> str:
-    """Filter the list of lines by indexing progessive columns
-    for either most/least common bit and only keeping matching rows.
+    Raises a ValueError if there are no values.
     """
-    left = list(lines)
-    index = 0
-    while len(left) > 1:
-        parser = parse_lines((line[index] for line in left))
-        bit = parser.format_value(parser.extract(frequency_index))
-        left = [line for line in left if line[index] == bit]
-        logger.debug("%s, %s", bit, left)
-        index += 1
-    return left[0]
-
-
-def part_two() -> None:
-    """Solve part two."""
-    # Eager evaluate lines list because we need to parse it multiple times
-    lines = list(core.load_data(sys.stdin))
-
-    oxygen_string = filter_lines(lines, 1)
-    co2_string = filter_lines(lines, 0)
-
-    oxygen = int(oxygen_string, base=2)
-    co2 = int(co2_string, base=2)
-
-    print(f"Oxygen: {oxygen_string} ({oxygen})")
-    print(f"CO2:    {co2_string} ({co2})")
-    print(f"Life Support: {oxygen*co2}")
-
-
-if __name__ == "__main__":
-    core.configure_logger(logger, level=logging.INFO)
-    core.cmd(3, part_one, part_two)
+    if len(values) == 0:
+        raise ValueError("Cannot select a rating from no values")
+    low, high = 0, len(values)
+    prefix = 0
+    for bit in reversed(range(width)):
+        if high - low <= 1:
+            break
+        # First line with a 1 at this bit
+        split = bisect.bisect_left(values, prefix | (1 << bit), low, high)
+        zeroes, ones = split - low, high - split
+        keep_ones = ones >= zeroes if most_common else ones < zeroes
+        if zeroes == 0 or (ones > 0 and keep_ones):
+            low = split
+            prefix |= 1 << bit
+        else:
+            high = split
+        logger.debug("Bit %s: %s lines left", bit, high - low)
+    return values[low]
+
+
+@component.hook(3, 2, year=2021)
+def two(input_stream: t.TextIO, output_stream: t.TextIO) -> None:
+    """Day 3 Part 2 solution."""
+    report = Report.from_bytes(input_stream.read().encode())
+    # Sort once, then each rating is O(width log n)
+    values = sorted(report.values())
+
+    oxygen = select_rating(values, report.width, most_common=True)
+    co2 = select_rating(values, report.width, most_common=False)
+
+    oxygen_string = format(oxygen, f"0{report.width}b")
+    co2_string = format(co2, f"0{report.width}b")
+
+    print(f"Oxygen: {oxygen_string} ({oxygen})", file=output_stream)
+    print(f"CO2:    {co2_string} ({co2})", file=output_stream)
+    print(f"Life Support: {oxygen*co2}", file=output_stream)
@@ -1,19 +1,21 @@
 """Solution for Day 4 of AoC."""
 
+import array
 import collections.abc as c
 import dataclasses
 import itertools
 import logging
-import sys
 import typing as t
 
 from . import core
 
-T = t.TypeVar("T")
 TCo = t.TypeVar("TCo", covariant=True)
 
 logger = logging.getLogger(__name__)
 
+# Define component to be imported by main
+component = core.Component()
+
 
 @dataclasses.dataclass(frozen=True)
 class Tile(t.Generic[TCo]):
@@ -27,63 +29,129 @@ BoardS = t.TypeVar("BoardS", bound="Board")
 
 
 @dataclasses.dataclass(frozen=True)
-class Board(t.Generic[T]):
+class Board:
     """Bingo board."""
 
-    rows: c.Sequence[c.Sequence[Tile[T]]]
-
-    @property
-    def columns(self) -> c.Sequence[c.Sequence[Tile[T]]]:
-        """Column major ordering of the board tiles."""
-        return list(zip(*self.rows))
-
-    def mark(self: BoardS, value: T) -> BoardS:
-        """Create a board with any tiles containing the given value marked."""
-        return type(self)(
-            [
-                [
-                    Tile(tile.value, True) if tile.value == value else tile
-                    for tile in row
-                ]
-                for row in self.rows
-            ]
+    # Values of each tile, and a parallel grid of marks (1 if marked)
+    values: core.Grid
+    marks: core.Grid
+
+    @classmethod
+    def from_rows(cls: t.Type[BoardS], rows: c.Iterable[c.Iterable[int]]) -> BoardS:
+        """Create an unmarked board from rows of values."""
+        values = core.Grid.from_rows(rows)
+        return cls(
+            values=values,
+            marks=core.Grid.filled(values.width, values.height, typecode="B"),
         )
 
-    def complete(self) -> bool:
-        """Whether the board has a solid row or column of marks."""
-        return any(all(tile.marked for tile in row) for row in self.rows) or any(
-            all(tile.marked for tile in column) for column in self.columns
-        )
-
-    def unmarked(self) -> c.Iterable[T]:
+    @property
+    def rows(self) -> c.Sequence[c.Sequence[Tile[int]]]:
+        """Row major ordering of the board tiles."""
+        return [
+            [Tile(value, bool(marked)) for value, marked in zip(values, marks)]
+            for values, marks in zip(self.values.rows(), self.marks.rows())
+        ]
+
+    def unmarked(self) -> c.Iterable[int]:
         """The values of unmarked tiles."""
-        return (tile.value for row in self.rows for tile in row if not tile.marked)
+        return (
+            value
+            for value, marked in zip(self.values.cells, self.marks.cells)
+            if not marked
+        )
 
 
-def read_input() -> tuple[c.Iterable[int], c.Iterable[Board[int]]]:
+def read_input(stream: t.TextIO) -> tuple[c.Iterable[int], c.Iterable[Board]]:
     """Read the puzzle input."""
 
     # Get the called numbers
-    calls = [int(number) for number in input().split(",")]
+    calls = core.extract_integers(stream.readline().encode())
 
-    # Advance stdin
-    input()
+    # Advance past the blank line
+    stream.readline()
 
+    # Tokenize every board at once;
+    # blank lines have no integers and separate the boards
+    board_lines = core.IntegerLines.extract(stream.read().encode())
     boards = [
-        Board(
-            # Whitespace split() consumes multiple spaces
-            [[Tile(int(number)) for number in row.strip().split()] for row in group]
-        )
-        for key, group in itertools.groupby(sys.stdin, key=lambda line: line == "\n")
+        Board.from_rows(group)
+        for key, group in itertools.groupby(board_lines, key=lambda row: len(row) == 0)
         if not key
     ]
 
     return calls, boards
 
 
+class Bingo:
+    """Incremental bingo game over many boards.
+
+    Indexes each value to the cells that hold it,
+    and keeps hit counters for every row and column of every board,
+    so a call only touches the cells matching it.
+    """
+
+    def __init__(self, boards: c.Iterable[Board]) -> None:
+        """Index the boards, taking over any marks they already have."""
+        boards = list(boards)
+        self.values = [board.values for board in boards]
+        self.marks = [
+            core.Grid.filled(grid.width, grid.height, typecode="B")
+            for grid in self.values
+        ]
+        self.row_hits = [array.array("l", [0]) * grid.height for grid in self.values]
+        self.column_hits = [array.array("l", [0]) * grid.width for grid in self.values]
+        self.won = [False] * len(self.values)
+
+        # Cells are indexed board by board, so hits are visited in board order
+        self.cells: t.Dict[int, t.List[tuple[int, core.Coord]]] = {}
+        for index, grid in enumerate(self.values):
+            for row in range(grid.height):
+                for column in range(grid.width):
+                    self.cells.setdefault(grid[row, column], []).append(
+                        (index, (row, column))
+                    )
+
+        for index, board in enumerate(boards):
+            for row in range(board.marks.height):
+                for column in range(board.marks.width):
+                    if board.marks[row, column]:
+                        self.hit(index, (row, column))
+
+    def hit(self, index: int, coord: core.Coord) -> bool:
+        """Mark a cell of a board, returning whether that board just won."""
+        marks = self.marks[index]
+        if marks[coord]:
+            return False
+        marks[coord] = 1
+        row, column = coord
+        self.row_hits[index][row] += 1
+        self.column_hits[index][column] += 1
+        if self.won[index]:
+            return False
+        self.won[index] = (
+            self.row_hits[index][row] == marks.width
+            or self.column_hits[index][column] == marks.height
+        )
+        return self.won[index]
+
+    def call(self, value: int) -> c.Sequence[int]:
+        """Mark a called value on every board.
+
+        Returns the indices of the boards this call completed, in board order.
+        """
+        return [
+            index for index, coord in self.cells.get(value, ()) if self.hit(index, coord)
+        ]
+
+    def board(self, index: int) -> Board:
+        """Snapshot of a board in its current state."""
+        return Board(values=self.values[index], marks=self.marks[index].copy())
+
+
 def winner(
-    calls: c.Iterable[T], boards: c.Iterable[Board[T]]
-) -> t.Optional[tuple[T, Board[T]]]:
+    calls: c.Iterable[int], boards: c.Iterable[Board]
+) -> t.Optional[tuple[int, Board]]:
     """Find the first winning board.
 
     Iterates calls until a winning board is found,
@@ -93,19 +161,12 @@ def winner(
 
     Returns None if no boards win after calls is exhausted.
     """
-    for call in calls:
-        # Mark the call
-        boards = [board.mark(call) for board in boards]
-        # Check for a winner
-        for board in boards:
-            if board.complete():
-                return call, board
-    return None
+    return next(iter(winners(calls, boards)), None)
 
 
 def winners(
-    calls: c.Iterable[T], boards: c.Iterable[Board[T]]
-) -> t.Iterable[tuple[T, Board[T]]]:
+    calls: c.Iterable[int], boards: c.Iterable[Board]
+) -> t.Iterable[tuple[int, Board]]:
     """Find the winning boards, sorted in order of winning.
 
     Yields call, board, where call is the call that completed board.
@@ -113,50 +174,121 @@ def winners(
     If boards win simultaneously,
     they are returned in the order provided.
     """
+    game = Bingo(boards)
     for call in calls:
-        # Mark the call
-        boards = [board.mark(call) for board in boards]
-        # Check for a winner
-        for board in boards:
-            if board.complete():
-                yield call, board
-        # Remove boards that have won
-        boards = [board for board in boards if not board.complete()]
+        for index in game.call(call):
+            yield call, game.board(index)
 
 
-def valuate(call: int, board: Board[int]) -> int:
+def valuate(call: int, board: Board) -> int:
     """The value of a completed board with the winning call."""
     return sum(board.unmarked()) * call
 
 
-def part_one() -> None:
-    """Solve Part One."""
-    calls, boards = read_input()
-    winning = iter(winners(calls, boards))
-    try:
-        call, board = next(winning)
-        print("First winner:")
-        print(f"Call: {call}")
-        print(f"Board: {board}")
-        print(f"Score: {valuate(call, board)}")
-    except StopIteration:
-        print("No winner.")
-
-
-def part_two() -> None:
-    """Solve Part Two."""
-    calls, boards = read_input()
-    winning = list(winners(calls, boards))
-    try:
-        call, board = winning[-1]
-        print("Last winner:")
-        print(f"Call: {call}")
-        print(f"Board: {board}")
-        print(f"Score: {valuate(call, board)}")
-    except IndexError:
-        print("No winner.")
-
-
-if __name__ == "__main__":
-    core.configure_logger(logger, level=logging.INFO)
-    core.cmd(4, part_one, part_two)
+def read_boards(stream: t.TextIO) -> c.Iterable[core.Grid]:
+    """Lazily read boards separated by blank lines, one at a time."""
+    rows: t.List["array.array[int]"] = []
+    for line in stream:
+        row = core.extract_integers(line.encode())
+        if len(row) > 0:
+            rows.append(row)
+        elif len(rows) > 0:
+            yield core.Grid.from_rows(rows)
+            rows = []
+    if len(rows) > 0:
+        yield core.Grid.from_rows(rows)
+
+
+@dataclasses.dataclass(frozen=True)
+class Win:
+    """The turn (index into the calls) a board wins on, the call, and the board."""
+
+    turn: int
+    call: int
+    board: Board
+
+
+def board_win(
+    values: core.Grid, turns: c.Mapping[int, int], calls: c.Sequence[int]
+) -> t.Optional[Win]:
+    """Work out when a board wins without playing the calls.
+
+    A line is complete on the turn its last value is called,
+    so the board wins on the earliest such turn over its rows and columns.
+    turns maps each value to the turn it is first called.
+    """
+    never = len(calls)
+    called = core.Grid(
+        width=values.width,
+        height=values.height,
+        cells=array.array("q", (turns.get(value, never) for value in values.cells)),
+    )
+    turn = min(
+        itertools.chain(
+            (max(row) for row in called.rows()),
+            (max(column) for column in called.columns()),
+        ),
+        default=never,
+    )
+    if turn >= never:
+        return None
+    marks = array.array("B", (called_turn <= turn for called_turn in called.cells))
+    board = Board(
+        values=values,
+        marks=core.Grid(width=values.width, height=values.height, cells=marks),
+    )
+    return Win(turn=turn, call=calls[turn], board=board)
+
+
+def first_and_last_wins(
+    calls: c.Sequence[int], boards: c.Iterable[core.Grid]
+) -> tuple[t.Optional[Win], t.Optional[Win]]:
+    """Find the first and last boards to win, streaming the boards.
+
+    Only the two running winners are held,
+    so the boards can come from a file larger than memory.
+    Ties go to the earlier board for first, and the later board for last,
+    matching the order of winners.
+    """
+    turns: t.Dict[int, int] = {}
+    for turn, call in enumerate(calls):
+        turns.setdefault(call, turn)
+
+    first: t.Optional[Win] = None
+    last: t.Optional[Win] = None
+    for values in boards:
+        win = board_win(values, turns, calls)
+        if win is None:
+            continue
+        if first is None or win.turn < first.turn:
+            first = win
+        if last is None or win.turn >= last.turn:
+            last = win
+    return first, last
+
+
+def display_win(title: str, win: t.Optional[Win], output_stream: t.TextIO) -> None:
+    """Format display a winning board."""
+    if win is None:
+        print("No winner.", file=output_stream)
+        return
+    print(title, file=output_stream)
+    print(f"Call: {win.call}", file=output_stream)
+    print(f"Board: {win.board.rows}", file=output_stream)
+    print(f"Score: {valuate(win.call, win.board)}", file=output_stream)
+
+
+@component.hook(4, 1, year=2021)
+def one(input_stream: t.TextIO, output_stream: t.TextIO) -> None:
+    """Day 4 Part 1 solution."""
+    calls = core.extract_integers(input_stream.readline().encode())
+    first, _ = first_and_last_wins(calls, read_boards(input_stream))
+    display_win("First winner:", first, output_stream)
+
+
+@component.hook(4, 2, year=2021)
+def two(input_stream: t.TextIO, output_stream: t.TextIO) -> None:
+    """Day 4 Part 2 solution."""
+    calls = core.extract_integers(input_stream.readline().encode())
+    _, last = first_and_last_wins(calls, read_boards(input_stream))
+    display_win("Last winner:", last, output_stream)
@@ -1,10 +1,12 @@
 """Solution for Day 5 of AoC."""
 
-import collections
+import array
+import bisect
+import collections.abc as c
 import dataclasses
 import itertools
 import logging
-import sys
+import operator
 import typing as t
 
 from . import core
@@ -16,6 +18,9 @@ TCo = t.TypeVar("TCo", covariant=True)
 
 logger = logging.getLogger(__name__)
 
+# Define component to be imported by main
+component = core.Component()
+
 TypeT = t.TypeVar("TypeT", bound=t.Type)
 
 
@@ -26,29 +31,6 @@ class Point(t.Generic[TCo]):
     x: TCo
     y: TCo
 
-    @classmethod
-    def parse(
-        cls, string: str, converter: t.Callable[[str], TCo], strip: bool = True
-    ) -> "Point[TCo]":
-        """Construct a Point by parsing a string.
-
-        Parses a string of the form 'x,y',
-        by default stripping any whitespace before and after each coordinate.
-
-        Passes through each coordinate through the provided converter.
-
-        Raises a ValueError if the string cannot be parsed,
-        and propogates errors raised by the conversion converter.
-        """
-        if strip:
-            string = string.strip()
-        try:
-            x_string, y_string = string.split(",")
-        except ValueError as split_error:
-            raise ValueError(f"Couldn't split string '{string}' on ,") from split_error
-
-        return cls(x=converter(x_string), y=converter(y_string))
-
 
 CS = t.TypeVar("CS", bound="Comparable")
 
@@ -66,20 +48,6 @@ def minmax(a: CS, b: CS) -> tuple[CS, CS]:
     return (left, right)
 
 
-def span(start: int, end: int) -> range:
-    """Create an appropriate range object.
-
-    Creates a range over the inclusive interval [start, end],
-    (i.e shifting end param to accomodate `range` exclusive behaviour)
-    and automatically uses a negative step if start > end.
-    """
-    if start > end:
-        step = -1
-    else:
-        step = 1
-    return range(start, end + step, step)
-
-
 @dataclasses.dataclass(frozen=True)
 class Line:
     """Euclidean 2D Box."""
@@ -87,25 +55,6 @@ class Line:
     origin: Point[int]
     end: Point[int]
 
-    def coverage(self) -> t.Iterable[Point[int]]:
-        """Return the points covered by this line.
-
-        Returns an undefined set when the line is not straight or 45 degrees.
-        """
-        # Span the two axes
-        x_span = span(self.origin.x, self.end.x)
-        y_span = span(self.origin.y, self.end.y)
-        # A 45 degree line will zip together perfectly
-        # but we need to special case straight ones
-        x_iter: t.Iterable[int] = x_span
-        y_iter: t.Iterable[int] = y_span
-        if self.vertical():
-            x_iter = itertools.repeat(self.origin.x, len(y_span))
-        if self.horizontal():
-            y_iter = itertools.repeat(self.origin.y, len(x_span))
-        # Return the iter of points
-        return (Point(x, y) for x, y in zip(x_iter, y_iter))
-
     def vertical(self) -> bool:
         """Whether the line is a straight vertical line."""
         return self.origin.x == self.end.x
@@ -122,55 +71,347 @@ class Line:
         return self.vertical() or self.horizontal()
 
 
-def density_map(lines: t.Iterable[Line]) -> collections.Counter[Point[int]]:
-    """Overlay lines to obtain a density map of the number of overlaps at each point."""
-    return collections.Counter(
-        itertools.chain.from_iterable(line.coverage() for line in lines)
+def clip(start: int, direction: int, length: int, low: int, high: int) -> range:
+    """The steps t in [0, length) where start + direction * t lies in [low, high)."""
+    if direction == 0:
+        return range(length) if low <= start < high else range(0)
+    if direction > 0:
+        first, stop = low - start, high - start
+    else:
+        first, stop = start - high + 1, start - low + 1
+    return range(max(first, 0), min(stop, length))
+
+
+def rasterize(line: Line, grid: core.Grid, origin: Point[int] = Point(0, 0)) -> None:
+    """Increment the cells of a density grid covered by a line.
+
+    The grid is indexed (y, x) relative to origin, and the line is clipped to it.
+    Horizontal, vertical and 45 degree lines are all a single strided slice
+    of the flat cells, incremented in one go.
+
+    Raises a ValueError for any other line.
+    """
+    delta_x = line.end.x - line.origin.x
+    delta_y = line.end.y - line.origin.y
+    if delta_x != 0 and delta_y != 0 and abs(delta_x) != abs(delta_y):
+        raise ValueError(f"Line {line} is not straight or 45 degrees")
+    # Unit step along each axis, and number of points covered
+    d_x = (delta_x > 0) - (delta_x < 0)
+    d_y = (delta_y > 0) - (delta_y < 0)
+    length = max(abs(delta_x), abs(delta_y)) + 1
+
+    x_steps = clip(line.origin.x, d_x, length, origin.x, origin.x + grid.width)
+    y_steps = clip(line.origin.y, d_y, length, origin.y, origin.y + grid.height)
+    first = max(x_steps.start, y_steps.start)
+    count = min(x_steps.stop, y_steps.stop) - first
+    if count <= 0:
+        return
+
+    start = grid.index(
+        (line.origin.y + d_y * first - origin.y, line.origin.x + d_x * first - origin.x)
+    )
+    step = d_y * grid.width + d_x
+    # Walk negative steps from the other end; a single point has no step
+    if step < 0:
+        start += step * (count - 1)
+        step = -step
+    step = max(step, 1)
+
+    covered = slice(start, start + step * (count - 1) + 1, step)
+    grid.cells[covered] = array.array(
+        grid.cells.typecode, map(operator.add, grid.cells[covered], itertools.repeat(1))
     )
 
 
-def parse_line(line: str) -> Line:
-    """Parse an input line into a 'Line', with origin/end.
+def overlaps(density: core.Grid) -> int:
+    """Number of cells in a density grid covered at least twice."""
+    return len(density.cells) - density.cells.count(0) - density.cells.count(1)
+
 
-    Takes a line of the form 'x1,y1 -> x2,y2'.
+def bounds(lines: c.Iterable[Line]) -> tuple[Point[int], Point[int]]:
+    """The lowest and highest corners of the box containing some lines.
+
+    Raises a ValueError if there are no lines.
     """
-    try:
-        origin_string, end_string = line.strip().split("->")
-    except ValueError as arrowException:
-        raise ValueError(
-            f"-> symbol does not exist as expected in string '{line}'"
-        ) from arrowException
-    origin = Point.parse(origin_string, converter=int)
-    end = Point.parse(end_string, converter=int)
-    return Line(origin=origin, end=end)
+    lines = list(lines)
+    if len(lines) == 0:
+        raise ValueError("No lines to bound")
+    return (
+        Point(
+            min(min(line.origin.x, line.end.x) for line in lines),
+            min(min(line.origin.y, line.end.y) for line in lines),
+        ),
+        Point(
+            max(max(line.origin.x, line.end.x) for line in lines),
+            max(max(line.origin.y, line.end.y) for line in lines),
+        ),
+    )
 
 
-def parse_input(stream: t.TextIO) -> t.Iterable[Line]:
-    """Parse puzzle input."""
-    return (parse_line(line) for line in stream)
+def count_overlaps(lines: t.Iterable[Line], max_cells: int = 1 << 24) -> int:
+    """Count the points covered by at least two lines.
 
+    Rasterizes into dense grids spanning the bounds of the lines,
+    split into tiles of at most max_cells cells when the bounds are too large,
+    in which case every line is clipped to each tile in turn.
+    """
+    lines = list(lines)
+    if len(lines) == 0:
+        return 0
+    low, high = bounds(lines)
+    min_x, min_y, max_x, max_y = low.x, low.y, high.x, high.y
 
-def part_one() -> None:
-    """Solve Part One.
+    tile_width = max(min(max_x - min_x + 1, max_cells), 1)
+    tile_height = max(min(max_y - min_y + 1, max_cells // tile_width), 1)
 
-    Counts the number of points with at least two overlapping lines.
+    total = 0
+    for top in range(min_y, max_y + 1, tile_height):
+        for left in range(min_x, max_x + 1, tile_width):
+            tile = core.Grid.filled(
+                min(tile_width, max_x + 1 - left),
+                min(tile_height, max_y + 1 - top),
+                typecode="l",
+            )
+            for line in lines:
+                rasterize(line, tile, origin=Point(left, top))
+            total += overlaps(tile)
+    return total
+
+
+# (lo, hi) inclusive range of parameters along a line
+Interval = tuple[int, int]
+
+
+@dataclasses.dataclass(frozen=True)
+class Direction:
+    """A family of parallel lines.
+
+    Each line of the family is identified by a key,
+    and each point along it by a parameter.
     """
-    lines = parse_input(sys.stdin)
-    # Only check straight lines
-    density = density_map(line for line in lines if line.straight_line())
-    overlaps = [point for point, number in density.items() if number > 1]
-    print(f"Number of Overlaps: {len(overlaps)}")
+
+    name: str
+    key: t.Callable[[int, int], int]
+    parameter: t.Callable[[int, int], int]
+    point: t.Callable[[int, int], core.Coord]
+
+    def locate(self, x: int, y: int) -> tuple[int, int]:
+        """The (key, parameter) of a point."""
+        return (self.key(x, y), self.parameter(x, y))
+
+
+HORIZONTAL = Direction(
+    "horizontal",
+    key=lambda x, y: y,
+    parameter=lambda x, y: x,
+    point=lambda key, parameter: (parameter, key),
+)
+VERTICAL = Direction(
+    "vertical",
+    key=lambda x, y: x,
+    parameter=lambda x, y: y,
+    point=lambda key, parameter: (key, parameter),
+)
+DIAGONAL = Direction(
+    "diagonal",
+    key=lambda x, y: y - x,
+    parameter=lambda x, y: x,
+    point=lambda key, parameter: (parameter, parameter + key),
+)
+ANTIDIAGONAL = Direction(
+    "antidiagonal",
+    key=lambda x, y: x + y,
+    parameter=lambda x, y: x,
+    point=lambda key, parameter: (parameter, key - parameter),
+)
+
+DIRECTIONS = (HORIZONTAL, VERTICAL, DIAGONAL, ANTIDIAGONAL)
+
+
+def direction(line: Line) -> Direction:
+    """The family a line belongs to; a single point counts as horizontal.
+
+    Raises a ValueError if the line is not straight or 45 degrees.
+    """
+    delta_x = line.end.x - line.origin.x
+    delta_y = line.end.y - line.origin.y
+    if delta_y == 0:
+        return HORIZONTAL
+    if delta_x == 0:
+        return VERTICAL
+    if delta_x == delta_y:
+        return DIAGONAL
+    if delta_x == -delta_y:
+        return ANTIDIAGONAL
+    raise ValueError(f"Line {line} is not straight or 45 degrees")
+
+
+def sweep(
+    segments: t.Iterable[tuple[int, int, int]]
+) -> tuple[t.Dict[int, t.List[Interval]], t.Dict[int, t.List[Interval]]]:
+    """Sweep (key, lo, hi) segments of one family, line by line.
+
+    Returns, per key, the sorted disjoint intervals covered at least once,
+    and those covered at least twice, from sorted +1/-1 events.
+    """
+    events: t.Dict[int, t.List[tuple[int, int]]] = {}
+    for key, low, high in segments:
+        events.setdefault(key, []).extend(((low, 1), (high + 1, -1)))
+
+    covered: t.Dict[int, t.List[Interval]] = {}
+    doubled: t.Dict[int, t.List[Interval]] = {}
+    for key, line_events in events.items():
+        line_events.sort()
+        depth = 0
+        covered_start = doubled_start = 0
+        for position, change in line_events:
+            before = depth
+            depth += change
+            if before == 0 and depth > 0:
+                covered_start = position
+            elif before > 0 and depth == 0:
+                covered.setdefault(key, []).append((covered_start, position - 1))
+            if before < 2 <= depth:
+                doubled_start = position
+            elif depth < 2 <= before:
+                doubled.setdefault(key, []).append((doubled_start, position - 1))
+    return covered, doubled
+
+
+def contains(intervals: c.Sequence[Interval], value: int) -> bool:
+    """Whether sorted disjoint intervals contain a value."""
+    index = bisect.bisect_right(intervals, value, key=lambda interval: interval[0])
+    return index > 0 and intervals[index - 1][1] >= value
+
+
+def crossings(
+    first: Direction,
+    first_covered: c.Mapping[int, c.Sequence[Interval]],
+    second: Direction,
+    second_covered: c.Mapping[int, c.Sequence[Interval]],
+) -> t.Iterable[core.Coord]:
+    """Points covered by both of two non parallel families.
+
+    For an interval of the first family, the key of the second family line
+    crossing it moves linearly along the interval,
+    so only the second family lines within a range of keys need checking.
+    """
+    keys = sorted(second_covered)
+    for first_key, intervals in first_covered.items():
+        # Key of the crossing second family line as a function of the parameter
+        offset = second.key(*first.point(first_key, 0))
+        slope = second.key(*first.point(first_key, 1)) - offset
+        for low, high in intervals:
+            low_key, high_key = sorted((offset + slope * low, offset + slope * high))
+            start = bisect.bisect_left(keys, low_key)
+            stop = bisect.bisect_right(keys, high_key)
+            for second_key in keys[start:stop]:
+                parameter, remainder = divmod(second_key - offset, slope)
+                if remainder != 0:
+                    continue
+                point = first.point(first_key, parameter)
+                if contains(second_covered[second_key], second.parameter(*point)):
+                    yield point
+
+
+def sweep_overlaps(lines: t.Iterable[Line]) -> int:
+    """Count the points covered by at least two lines, without visiting points.
+
+    Each family of parallel lines is swept separately for stretches covered twice,
+    then points where different families cross are added,
+    so the work depends on the number of lines rather than their lengths.
+    """
+    segments: t.Dict[str, t.List[tuple[int, int, int]]] = {
+        family.name: [] for family in DIRECTIONS
+    }
+    for line in lines:
+        family = direction(line)
+        key, low = family.locate(line.origin.x, line.origin.y)
+        _, high = family.locate(line.end.x, line.end.y)
+        segments[family.name].append((key, min(low, high), max(low, high)))
+
+    covered = {}
+    doubled = {}
+    for family in DIRECTIONS:
+        covered[family.name], doubled[family.name] = sweep(segments[family.name])
+
+    total = sum(
+        high - low + 1
+        for family in DIRECTIONS
+        for intervals in doubled[family.name].values()
+        for low, high in intervals
+    )
+
+    # Points covered by more than one family; count each once,
+    # undoing any counting already done through the doubled stretches
+    crossed = {
+        point
+        for index, first in enumerate(DIRECTIONS)
+        for second in DIRECTIONS[index + 1 :]
+        for point in crossings(
+            first, covered[first.name], second, covered[second.name]
+        )
+    }
+    for x, y in crossed:
+        total += 1 - sum(
+            1
+            for family in DIRECTIONS
+            if contains(
+                doubled[family.name].get(family.key(x, y), ()), family.parameter(x, y)
+            )
+        )
+    return total
+
+
+# Bounds spanning more cells than this are swept rather than rasterized
+DENSE_LIMIT = 1 << 24
+
+
+def solve_overlaps(lines: t.Iterable[Line]) -> int:
+    """Count the points covered by at least two lines, picking an engine.
+
+    Rasterizes when the bounds are small enough for one grid,
+    and sweeps when the lines are spread over a larger area.
+    """
+    lines = list(lines)
+    if len(lines) == 0:
+        return 0
+    low, high = bounds(lines)
+    if (high.x - low.x + 1) * (high.y - low.y + 1) > DENSE_LIMIT:
+        return sweep_overlaps(lines)
+    return count_overlaps(lines)
 
 
-def part_two() -> None:
-    """Solve Part Two."""
-    lines = parse_input(sys.stdin)
+def parse_input(stream: t.TextIO) -> t.Iterable[Line]:
+    """Parse puzzle input.
+
+    Tokenizes the whole input at once, every four integers forming a line.
+    """
+    values = core.extract_integers(stream.read().encode())
+    if len(values) % 4 != 0:
+        raise ValueError("Input is not made up of lines of the form 'x1,y1 -> x2,y2'")
+    coordinates = iter(values)
+    return (
+        Line(origin=Point(x1, y1), end=Point(x2, y2))
+        for x1, y1, x2, y2 in zip(coordinates, coordinates, coordinates, coordinates)
+    )
+
+
+@component.hook(DAY, 1, year=2021)
+def one(input_stream: t.TextIO, output_stream: t.TextIO) -> None:
+    """Day 5 Part 1 solution.
+
+    Counts the number of points with at least two overlapping lines.
+    """
+    lines = parse_input(input_stream)
     # Only check straight lines
-    density = density_map(lines)
-    overlaps = [point for point, number in density.items() if number > 1]
-    print(f"Number of Overlaps: {len(overlaps)}")
+    overlapping = solve_overlaps(line for line in lines if line.straight_line())
+    print(f"Number of Overlaps: {overlapping}", file=output_stream)
 
 
-if __name__ == "__main__":
-    core.configure_logger(logger, level=logging.INFO)
-    core.cmd(DAY, part_one, part_two)
+@component.hook(DAY, 2, year=2021)
+def two(input_stream: t.TextIO, output_stream: t.TextIO) -> None:
+    """Day 5 Part 2 solution."""
+    lines = parse_input(input_stream)
+    overlapping = solve_overlaps(lines)
+    print(f"Number of Overlaps: {overlapping}", file=output_stream)
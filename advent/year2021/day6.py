@@ -4,7 +4,7 @@ import collections
 import collections.abc as c
 import dataclasses
 import logging
-import sys
+import operator
 import typing as t
 
 from . import core
@@ -13,7 +13,8 @@ logger = logging.getLogger(__name__)
 
 DAY = 6
 
-LS = t.TypeVar("LS", bound="Lanternfish")
+# Define component to be imported by main
+component = core.Component()
 
 
 @dataclasses.dataclass(frozen=True)
@@ -25,22 +26,6 @@ class Lanternfish:
     RESET = 6
     START = 8
 
-    def tick(self: LS) -> tuple[LS, t.Optional["Lanternfish"]]:
-        """Increment time for this fish by one.
-
-        If the fish gives birth, the new fish is returned.
-        """
-        birth = None
-
-        timer = self.timer - 1
-        # Check for a new birth
-        if timer < 0:
-            timer = self.RESET
-            birth = type(self)(timer=self.START)
-
-        # Return updated fish and new birth if existant
-        return (type(self)(timer=timer), birth)
-
 
 LanternfishSwarm = collections.Counter[Lanternfish]
 
@@ -58,44 +43,169 @@ def read_input(stream: t.TextIO) -> c.Iterable[Lanternfish]:
     )
 
 
-def advance(swarm: LanternfishSwarm) -> LanternfishSwarm:
-    """Tick each of the provided fish, appending any new fish."""
-    new: LanternfishSwarm = collections.Counter()
+# Square matrix of exact integers, row major
+Matrix = c.Sequence[c.Sequence[int]]
+
+
+def transition(
+    size: int, reset: int = Lanternfish.RESET, start: int = Lanternfish.START
+) -> Matrix:
+    """The matrix advancing a vector of counts per timer value by one day.
+
+    Every timer counts down by one,
+    and fish at zero move to reset while adding as many at start.
+    """
+    matrix = [[0] * size for _ in range(size)]
+    for timer in range(1, size):
+        matrix[timer - 1][timer] = 1
+    matrix[reset][0] += 1
+    matrix[start][0] += 1
+    return matrix
+
+
+def multiply(left: Matrix, right: Matrix) -> Matrix:
+    """Matrix product."""
+    columns = list(zip(*right))
+    return [[sum(map(operator.mul, row, column)) for column in columns] for row in left]
+
+
+def apply(matrix: Matrix, vector: c.Sequence[int]) -> c.Sequence[int]:
+    """Matrix-vector product."""
+    return [sum(map(operator.mul, row, vector)) for row in matrix]
+
+
+def counts(swarm: LanternfishSwarm, size: int) -> c.Sequence[int]:
+    """Vector of the number of fish at each timer value."""
+    vector = [0] * size
     for fish, count in swarm.items():
-        nfish, birth = fish.tick()
-        if birth:
-            new[birth] += count
-        new[nfish] += count
-    return new
+        vector[fish.timer] += count
+    return vector
+
+
+def project(
+    swarm: LanternfishSwarm,
+    days: int,
+    reset: int = Lanternfish.RESET,
+    start: int = Lanternfish.START,
+) -> LanternfishSwarm:
+    """Population after some days, in O(log days) matrix products.
+
+    Exponentiates the one day transition by squaring,
+    applying each needed power straight to the count vector.
+    All arithmetic is on exact integers.
+    """
+    size = max([start, reset, *(fish.timer for fish in swarm)]) + 1
+    vector = counts(swarm, size)
+    power = transition(size, reset=reset, start=start)
+    while days > 0:
+        if days & 1:
+            vector = apply(power, vector)
+        days >>= 1
+        if days > 0:
+            power = multiply(power, power)
+    return collections.Counter(
+        {Lanternfish(timer): count for timer, count in enumerate(vector) if count > 0}
+    )
 
 
-def simulate(swarm: LanternfishSwarm, days: int = 1) -> LanternfishSwarm:
-    """Simulates a population of Lanternfish."""
-    logger.info(swarm)
-    for _ in range(days):
-        swarm = advance(swarm)
-        logger.info(swarm)
-    return swarm
+class Projector:
+    """Answers many population queries, sharing matrix powers between them.
+
+    Works with the transposed transition,
+    so that (transposed)^days applied to a vector of ones
+    gives the population descended from one fish at each timer value.
+    """
+
+    def __init__(
+        self,
+        size: int,
+        reset: int = Lanternfish.RESET,
+        start: int = Lanternfish.START,
+    ) -> None:
+        """Initialize with the transposed one day transition."""
+        self.size = size
+        # powers[k] is the transposed transition to the power 2^k
+        one_day = transition(size, reset=reset, start=start)
+        self.powers: t.List[Matrix] = [[list(column) for column in zip(*one_day)]]
+
+    def power(self, exponent: int) -> Matrix:
+        """The transposed transition to the power 2^exponent, squaring as needed."""
+        while len(self.powers) <= exponent:
+            self.powers.append(multiply(self.powers[-1], self.powers[-1]))
+        return self.powers[exponent]
+
+    def descendants(self, horizons: c.Iterable[int]) -> c.Mapping[int, c.Sequence[int]]:
+        """For each horizon, the population descended from one fish at each timer.
+
+        Walks the horizons in ascending order,
+        advancing only by the gap from the previous one.
+        """
+        weights: c.Sequence[int] = [1] * self.size
+        reached = 0
+        found = {}
+        for horizon in sorted(set(horizons)):
+            gap = horizon - reached
+            exponent = 0
+            while gap > 0:
+                if gap & 1:
+                    weights = apply(self.power(exponent), weights)
+                gap >>= 1
+                exponent += 1
+            reached = horizon
+            found[horizon] = weights
+        return found
+
+
+def populations(
+    swarms: c.Sequence[LanternfishSwarm],
+    horizons: c.Sequence[int],
+    reset: int = Lanternfish.RESET,
+    start: int = Lanternfish.START,
+) -> c.Sequence[c.Sequence[int]]:
+    """Population of every swarm at every horizon, answered as one batch.
+
+    Returns a row per swarm with a total per horizon, in the order given.
+    The count vectors are stacked into one matrix,
+    so the whole batch is a single product with the per horizon weights.
+    """
+    if len(swarms) == 0 or len(horizons) == 0:
+        return [[] for _ in swarms]
+    size = max([start, reset, *(fish.timer for swarm in swarms for fish in swarm)]) + 1
+    weights = Projector(size, reset=reset, start=start).descendants(horizons)
+    # One row of weights per horizon, and one column of counts per swarm
+    rows = [weights[horizon] for horizon in horizons]
+    vectors = [counts(swarm, size) for swarm in swarms]
+    columns = [list(column) for column in zip(*vectors)]
+    # Transpose back to a row per swarm
+    return [list(totals) for totals in zip(*multiply(rows, columns))]
+
+
+def read_swarms(stream: t.TextIO) -> c.Iterable[LanternfishSwarm]:
+    """Read one swarm per line of comma separated timers."""
+    return (
+        collections.Counter(
+            Lanternfish(timer) for timer in core.extract_integers(line.encode())
+        )
+        for line in core.load_data(stream)
+        if len(line) > 0
+    )
 
 
-def solve(days: int) -> None:
+def solve(input_stream: t.TextIO, output_stream: t.TextIO, days: int) -> None:
     """Solve the puzzle to the specified simulation length."""
-    fishes = read_input(sys.stdin)
+    fishes = read_input(input_stream)
     swarm = compress(fishes)
-    end = simulate(swarm, days)
-    print(f"Final Population: {end.total()}")
-
-
-def part_one() -> None:
-    """Solve Part One"""
-    solve(80)
+    end = project(swarm, days)
+    print(f"Final Population: {end.total()}", file=output_stream)
 
 
-def part_two() -> None:
-    """Solve Part Two."""
-    solve(256)
+@component.hook(DAY, 1, year=2021)
+def one(input_stream: t.TextIO, output_stream: t.TextIO) -> None:
+    """Day 6 Part 1 solution."""
+    solve(input_stream, output_stream, 80)
 
 
-if __name__ == "__main__":
-    core.configure_logger(logger, level=logging.INFO)
-    core.cmd(DAY, part_one, part_two)
+@component.hook(DAY, 2, year=2021)
+def two(input_stream: t.TextIO, output_stream: t.TextIO) -> None:
+    """Day 6 Part 2 solution."""
+    solve(input_stream, output_stream, 256)
@@ -1,10 +1,11 @@
 """Solution for Day 7 of AoC."""
 
+import array
 import collections.abc as c
-import functools
+import dataclasses
 import logging
 import statistics
-import sys
+import typing as t
 
 from . import core
 
@@ -12,6 +13,9 @@ logger = logging.getLogger(__name__)
 
 DAY = 7
 
+# Define component to be imported by main
+component = core.Component()
+
 
 def alignment_cost(positions: c.Iterable[int], target: int = 0) -> int:
     """The total cost (distance) to align each position to the target."""
@@ -23,15 +27,6 @@ def optimal_target(positions: c.Iterable[int]) -> int:
     return statistics.median_low(positions)
 
 
-def part_one() -> None:
-    """Solve Part One"""
-    # need a list comprehension since we need to iterate over it twice
-    positions = [
-        int(raw) for line in core.load_data(sys.stdin) for raw in line.split(",")
-    ]
-    print(alignment_cost(positions, optimal_target(positions)))
-
-
 def triangle(base: int) -> int:
     """The `base`-th triangle number.
 
@@ -45,30 +40,109 @@ def triangle_cost(positions: c.Iterable[int], target: int = 0) -> int:
     return sum(triangle(abs(pos - target)) for pos in positions)
 
 
-def optimal_triangle_target(positions: c.Iterable[int]) -> int:
-    """The optimal alignment target, based on triangle distance."""
-    # Ensure we can iterate multiple times
-    positions = tuple(positions)
-    return min(
-        (
-            target
-            for target in range(
-                min(positions),
-                max(positions) + 1,
-            )
-        ),
-        key=functools.partial(triangle_cost, positions),
+@dataclasses.dataclass(frozen=True)
+class Alignment:
+    """Best alignment target and its total cost."""
+
+    target: int
+    cost: int
+
+
+def sweep_alignments(positions: c.Sequence[int]) -> tuple[Alignment, Alignment]:
+    """Best linear and triangle alignments, checking every target in O(n + range).
+
+    Builds a histogram of positions, then sweeps the targets in order,
+    keeping running counts and sums of the positions at or below the target.
+    The linear cost only needs those;
+    the triangle cost is (distance^2 + distance) / 2 summed,
+    and the squared distances expand to n t^2 - 2 t sum + sum of squares.
+
+    Raises a ValueError if there are no positions.
+    """
+    if len(positions) == 0:
+        raise ValueError("Cannot align no positions")
+    low = min(positions)
+    histogram = array.array("q", [0]) * (max(positions) - low + 1)
+    for position in positions:
+        histogram[position - low] += 1
+
+    number = len(positions)
+    total = sum(positions)
+    total_squares = sum(position * position for position in positions)
+
+    linear = triangular = None
+    below_count = below_total = 0
+    for offset, here in enumerate(histogram):
+        target = low + offset
+        below_count += here
+        below_total += here * target
+        above_count = number - below_count
+        above_total = total - below_total
+        distance = (below_count * target - below_total) + (
+            above_total - above_count * target
+        )
+        squares = number * target * target - 2 * target * total + total_squares
+        if linear is None or distance < linear.cost:
+            linear = Alignment(target, distance)
+        if triangular is None or (squares + distance) // 2 < triangular.cost:
+            triangular = Alignment(target, (squares + distance) // 2)
+
+    # There is always at least one target
+    assert linear is not None and triangular is not None
+    return linear, triangular
+
+
+def narrow_alignments(positions: c.Sequence[int]) -> tuple[Alignment, Alignment]:
+    """Best linear and triangle alignments, checking only a few targets.
+
+    The linear cost is minimised at the median,
+    and the triangle cost within half a step of the mean,
+    so this suits few positions spread over a wide range.
+
+    Raises a ValueError if there are no positions.
+    """
+    if len(positions) == 0:
+        raise ValueError("Cannot align no positions")
+    median = optimal_target(positions)
+    mean = sum(positions) // len(positions)
+    candidates = range(
+        max(mean - 1, min(positions)), min(mean + 2, max(positions)) + 1
     )
+    triangular = min(
+        (Alignment(target, triangle_cost(positions, target)) for target in candidates),
+        key=lambda alignment: alignment.cost,
+    )
+    return Alignment(median, alignment_cost(positions, median)), triangular
+
 
+# Sweep every target when the range is at most this many times the positions
+DENSE_FACTOR = 16
 
-def part_two() -> None:
-    """Solve Part Two."""
-    positions = [
-        int(raw) for line in core.load_data(sys.stdin) for raw in line.split(",")
-    ]
-    print(triangle_cost(positions, optimal_triangle_target(positions)))
 
+def best_alignments(positions: c.Sequence[int]) -> tuple[Alignment, Alignment]:
+    """Best linear and triangle alignments, choosing the cheaper search.
 
-if __name__ == "__main__":
-    core.configure_logger(logger, level=logging.INFO)
-    core.cmd(DAY, part_one, part_two)
+    Raises a ValueError if there are no positions.
+    """
+    if len(positions) == 0:
+        raise ValueError("Cannot align no positions")
+    spread = max(positions) - min(positions)
+    if spread < DENSE_FACTOR * len(positions):
+        return sweep_alignments(positions)
+    return narrow_alignments(positions)
+
+
+@component.hook(DAY, 1, year=2021)
+def one(input_stream: t.TextIO, output_stream: t.TextIO) -> None:
+    """Day 7 Part 1 solution."""
+    positions = core.extract_integers(input_stream.read().encode())
+    linear, _ = best_alignments(positions)
+    print(linear.cost, file=output_stream)
+
+
+@component.hook(DAY, 2, year=2021)
+def two(input_stream: t.TextIO, output_stream: t.TextIO) -> None:
+    """Day 7 Part 2 solution."""
+    positions = core.extract_integers(input_stream.read().encode())
+    _, triangular = best_alignments(positions)
+    print(triangular.cost, file=output_stream)
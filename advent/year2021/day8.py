@@ -1,17 +1,124 @@
 """Solution for Day 8 of AoC."""
 
+import collections.abc as c
+import dataclasses
+import logging
+import typing as t
+
 from . import core
 
+logger = logging.getLogger(__name__)
 
-def part_one() -> None:
-    """Solution for Part One."""
+DAY = 8
 
+# Define component to be imported by main
+component = core.Component()
 
-def part_two() -> None:
-    """Solution for Part Two."""
+# The segment wires lit for a digit, as a 7 bit mask with bit 0 for wire 'a'
+Pattern = int
 
+SEGMENT_BITS = {wire: 1 << bit for bit, wire in enumerate("abcdefg")}
+
+# Digits that light a unique number of segments
+UNIQUE_LENGTHS = {2: 1, 3: 7, 4: 4, 7: 8}
+
+# Every digit is identified by how many segments it lights,
+# and how many of those it shares with one and with four
+DEDUCTIONS = {
+    (6, 2, 3): 0,
+    (2, 2, 2): 1,
+    (5, 1, 2): 2,
+    (5, 2, 3): 3,
+    (4, 2, 4): 4,
+    (5, 1, 3): 5,
+    (6, 1, 3): 6,
+    (3, 2, 2): 7,
+    (7, 2, 4): 8,
+    (6, 2, 4): 9,
+}
+
+
+def mask(wires: str) -> Pattern:
+    """Encode the wires of a pattern as a bit mask."""
+    return sum(map(SEGMENT_BITS.__getitem__, wires))
+
+
+@dataclasses.dataclass(frozen=True)
+class Display:
+    """Observed signal patterns and output of a scrambled seven segment display."""
+
+    patterns: c.Sequence[Pattern]
+    outputs: c.Sequence[Pattern]
+
+
+def parse_display(line: str) -> Display:
+    """Parse a line of the form 'pattern ... pattern | output ... output'."""
+    try:
+        patterns_text, outputs_text = line.split("|")
+    except ValueError as pipe_error:
+        raise ValueError(
+            f"| symbol does not exist as expected in string '{line}'"
+        ) from pipe_error
+    return Display(
+        patterns=[mask(pattern) for pattern in patterns_text.split()],
+        outputs=[mask(output) for output in outputs_text.split()],
+    )
+
+
+def parse_input(stream: t.TextIO) -> c.Iterable[Display]:
+    """Parse puzzle input."""
+    return (parse_display(line) for line in core.load_data(stream) if len(line) > 0)
+
+
+def deduce(patterns: c.Iterable[Pattern]) -> tuple[Pattern, Pattern]:
+    """Find the patterns of one and four among the ten patterns of a display.
+
+    These are all that is needed to decode any other pattern of the display.
+    """
+    one = four = 0
+    for pattern in patterns:
+        match pattern.bit_count():
+            case 2:
+                one = pattern
+            case 4:
+                four = pattern
+    return one, four
+
+
+def digit(pattern: Pattern, one: Pattern, four: Pattern) -> int:
+    """Decode a pattern by popcounts through DEDUCTIONS, with no search over wirings."""
+    return DEDUCTIONS[
+        (
+            pattern.bit_count(),
+            (pattern & one).bit_count(),
+            (pattern & four).bit_count(),
+        )
+    ]
+
+
+def decode(display: Display) -> int:
+    """Read the output value of a display."""
+    one, four = deduce(display.patterns)
+    value = 0
+    for output in display.outputs:
+        value = value * 10 + digit(output, one, four)
+    return value
+
+
+@component.hook(DAY, 1, year=2021)
+def one(input_stream: t.TextIO, output_stream: t.TextIO) -> None:
+    """Day 8 Part 1 solution."""
+    count = sum(
+        1
+        for display in parse_input(input_stream)
+        for output in display.outputs
+        if output.bit_count() in UNIQUE_LENGTHS
+    )
+    print(f"Uniquely sized outputs: {count}", file=output_stream)
 
-DAY = 8
 
-if __name__ == "__main__":
-    core.cmd(DAY, part_one, part_two)
+@component.hook(DAY, 2, year=2021)
+def two(input_stream: t.TextIO, output_stream: t.TextIO) -> None:
+    """Day 8 Part 2 solution."""
+    total = sum(decode(display) for display in parse_input(input_stream))
+    print(f"Total output: {total}", file=output_stream)
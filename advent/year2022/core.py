@@ -1,5 +1,23 @@
 """Core utilities for Advent of Code 2022."""
 
-from advent.core import configure_logger, Component, load_data
+from advent.core import (
+    configure_logger,
+    Component,
+    load_data,
+    Buffer,
+    map_file,
+    parallel_path,
+    extract_integers,
+    IntegerLines,
+)
 
-__all__ = ["configure_logger", "Component", "load_data"]
+__all__ = [
+    "configure_logger",
+    "Component",
+    "load_data",
+    "Buffer",
+    "map_file",
+    "parallel_path",
+    "extract_integers",
+    "IntegerLines",
+]
@@ -1,6 +1,6 @@
 """Solution to Day 1 of AoC."""
 
-import itertools
+import heapq
 import logging
 import typing as t
 
@@ -12,33 +12,74 @@ logger = logging.getLogger(__name__)
 component = core.Component()
 
 
-def parse_data(lines: t.Iterable[str]) -> t.Iterable[t.Sequence[int]]:
-    """Parse elf calorie carrying from input data."""
-    return (
-        [int(value) for value in group]
-        for key, group in itertools.groupby(lines, key=lambda line: len(line) > 0)
-        if key
-    )
+def group_sums(lines: t.Iterable[str]) -> t.Iterable[int]:
+    """Stream the total calories of each elf, without collecting their items."""
+    total: t.Optional[int] = None
+    for line in lines:
+        if len(line) > 0:
+            total = int(line) + (total or 0)
+        elif total is not None:
+            yield total
+            total = None
+    if total is not None:
+        yield total
+
+
+def group_sums_bytes(data: core.Buffer) -> t.Iterable[int]:
+    """Stream the total calories of each elf from a buffer, such as an mmap.
+
+    Elves are separated by an empty line, found with a plain find,
+    and each elf is sliced out and summed on its own.
+    """
+    separator = b"\r\n\r\n" if data.find(b"\r\n") >= 0 else b"\n\n"
+    start = 0
+    while start < len(data):
+        end = data.find(separator, start)
+        if end < 0:
+            end = len(data)
+        items = data[start:end].split()
+        if len(items) > 0:
+            yield sum(map(int, items))
+        start = end + len(separator)
+
+
+def top_calories(input_stream: t.TextIO, k: int) -> int:
+    """Sum of the k largest elf totals in the input.
+
+    Regular files are memory mapped and split on empty lines directly,
+    other streams are summed line by line.
+    Either way, memory does not grow with the input.
+    """
+    path = core.parallel_path(input_stream, threshold=1)
+    if path is None:
+        return top_total(group_sums(core.load_data(input_stream)), k)
+    with core.map_file(path) as data:
+        return top_total(group_sums_bytes(data), k)
+
+
+def top_total(totals: t.Iterable[int], k: int) -> int:
+    """Sum of the k largest totals, holding only a heap of k totals."""
+    if k <= 0:
+        return 0
+    heap: t.List[int] = []
+    for total in totals:
+        if len(heap) < k:
+            heapq.heappush(heap, total)
+        elif total > heap[0]:
+            heapq.heapreplace(heap, total)
+    return sum(heap)
 
 
 @component.hook(1, 1, year=2022)
 def one(input_stream: t.TextIO, output_stream: t.TextIO) -> None:
     """Day 1 Part 1 solution."""
-    lines = core.load_data(input_stream)
-    elves = parse_data(lines)
-    # Real data will never be empty but for max to type correctly we should provide a default
-    most: int = max(map(sum, elves), default=0)
+    # Real data will never be empty but an empty input gives 0
+    most = top_calories(input_stream, 1)
     print(f"Most total calories: {most}", file=output_stream)
 
 
 @component.hook(1, 2, year=2022)
 def two(input_stream: t.TextIO, output_stream: t.TextIO) -> None:
     """Day 1 Part 2 solution."""
-    lines = core.load_data(input_stream)
-    elves = parse_data(lines)
-    # Sort the elves carrying calories by highest first
-    carries = sorted([sum(elf) for elf in elves], reverse=True)
-    # Take the top 3
-    top = carries[:3]
-    total = sum(top)
+    total = top_calories(input_stream, 3)
     print(f"Top three total calories: {total}", file=output_stream)
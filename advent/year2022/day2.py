@@ -1,5 +1,6 @@
 """Solution to Day 2 of AoC."""
 
+import collections
 import enum
 import logging
 import typing as t
@@ -93,17 +94,45 @@ def parse_desired_game(encoding: str) -> t.Tuple[RPS, RPS]:
     return (player_symbol, opponent_symbol)
 
 
+# Every possible round, as written in the input
+ROUNDS = tuple(f"{opponent} {player}" for opponent in "ABC" for player in "XYZ")
+ENCODED_ROUNDS = frozenset(encoding.encode() for encoding in ROUNDS)
+
+# Score of each possible round, read as a play or as a desired outcome
+GUESSED_SCORES = {encoding: score(*parse_game(encoding)) for encoding in ROUNDS}
+DESIRED_SCORES = {encoding: score(*parse_desired_game(encoding)) for encoding in ROUNDS}
+
+
+def tally(data: bytes) -> t.Mapping[str, int]:
+    """Count how often each possible round occurs in a buffer of rounds.
+
+    Surrounding whitespace and blank lines are ignored.
+
+    Raises a ValueError if there are rounds that are not recognized.
+    """
+    counts = collections.Counter(
+        b" ".join(line.split()) for line in data.splitlines() if line.strip()
+    )
+    unknown = counts.keys() - ENCODED_ROUNDS
+    if unknown:
+        raise ValueError(f"Rounds not recognized: {sorted(unknown)}")
+    return {encoding: counts[encoding.encode()] for encoding in ROUNDS}
+
+
+def total_score(counts: t.Mapping[str, int], scores: t.Mapping[str, int]) -> int:
+    """Total score of tallied rounds, as a dot product with per round scores."""
+    return sum(count * scores[encoding] for encoding, count in counts.items())
+
+
 @component.hook(2, 1, year=2022)
 def one(input_stream: t.TextIO, output_stream: t.TextIO) -> None:
     """Solve Day 2 Part 1."""
-    games = [parse_game(line) for line in core.load_data(input_stream)]
-    total = sum(score(player, opponent) for player, opponent in games)
+    total = total_score(tally(input_stream.read().encode()), GUESSED_SCORES)
     print(f"Total score: {total}", file=output_stream)
 
 
 @component.hook(2, 2, year=2022)
 def two(input_stream: t.TextIO, output_stream: t.TextIO) -> None:
     """Solve Day 2 Part 2."""
-    games = [parse_desired_game(line) for line in core.load_data(input_stream)]
-    total = sum(score(player, opponent) for player, opponent in games)
+    total = total_score(tally(input_stream.read().encode()), DESIRED_SCORES)
     print(f"Total score: {total}", file=output_stream)
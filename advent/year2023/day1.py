@@ -2,6 +2,7 @@
 
 import string
 import logging
+import re
 import typing as t
 
 from advent import core
@@ -12,74 +13,76 @@ logger = logging.getLogger(__name__)
 component = core.Component()
 
 
-def parse_numbers(lines: t.Iterable[str]) -> t.Iterable[t.Tuple[int, int]]:
-    """Parse first and last digit from lines.
+# Value of every spelling of a digit, spelled out or as a numeral
+SPELLINGS = {
+    b"one": 1,
+    b"two": 2,
+    b"three": 3,
+    b"four": 4,
+    b"five": 5,
+    b"six": 6,
+    b"seven": 7,
+    b"eight": 8,
+    b"nine": 9,
+    **{str(number).encode(): number for number in range(1, 10)},
+}
 
-    If there is only a single digit,
-    it is repeated. If there are no digits,
-    returns (0, 0).
+# The first spelling is the leftmost match, and a greedy prefix
+# backtracks from the end of the line, so its match is the last spelling
+FIRST_SPELLING = re.compile(b"|".join(SPELLINGS))
+LAST_SPELLING = re.compile(rb".*(" + b"|".join(SPELLINGS) + rb")")
+
+# A line of input, without its line ending
+LINE = re.compile(rb"[^\r\n]+")
+
+# Every byte that is not a numeral
+NON_DIGITS = bytes(set(range(256)) - set(string.digits.encode()))
+
+
+def numeral_digits(line: bytes) -> t.Tuple[int, int]:
+    """First and last numeral of a line, or (0, 0) if there are none.
+
+    Deletes everything else with a single translate.
     """
-    return (
-        (0, 0) if len(digits) == 0 else (int(digits[0]), int(digits[-1]))
-        for digits in (
-            list(filter(lambda char: char in string.digits, line)) for line in lines
-        )
-    )
-
-
-def find_text_numbers(text: str) -> t.Tuple[int, int]:
-    """Normalize a string by replacing all spellings of digits with the actual digit."""
-    digits = {
-        "one": 1,
-        "two": 2,
-        "three": 3,
-        "four": 4,
-        "five": 5,
-        "six": 6,
-        "seven": 7,
-        "eight": 8,
-        "nine": 9,
-        "1": 1,
-        "2": 2,
-        "3": 3,
-        "4": 4,
-        "5": 5,
-        "6": 6,
-        "7": 7,
-        "8": 8,
-        "9": 9,
-    }
-    first = min(
-        ((number, text.find(name)) for name, number in digits.items()),
-        # tuples are sorted element wise; if find returned -1
-        # we ensure it will be sorted after anything that was actually found
-        key=lambda pair: (1 if pair[1] == -1 else 0, pair[1]),
-    )
-    # We still use min here because we are reversing the strings
-    last = min(
-        (
-            (
-                number,
-                "".join(reversed(text)).find("".join(reversed(name))),
-            )
-            for name, number in digits.items()
-        ),
-        key=lambda pair: (1 if pair[1] == -1 else 0, pair[1]),
-    )
-    return (first[0], last[0])
+    digits = line.translate(None, NON_DIGITS)
+    if len(digits) == 0:
+        return (0, 0)
+    # Byte values of numerals start at ord("0")
+    return (digits[0] - 48, digits[-1] - 48)
+
+
+def spelled_digits(line: bytes) -> t.Tuple[int, int]:
+    """First and last digit of a line, spelled or numeral, or (0, 0) if there are none.
+
+    Scans forwards from the start and backwards from the end,
+    each stopping at the first match, so spellings that overlap (e.g. 'twone')
+    are found from either side.
+    """
+    first = FIRST_SPELLING.search(line)
+    if first is None:
+        return (0, 0)
+    last = LAST_SPELLING.match(line)
+    # There is a last match if there is a first one
+    assert last is not None
+    return (SPELLINGS[first.group()], SPELLINGS[last.group(1)])
+
+
+def lines(data: core.Buffer) -> t.Iterable[bytes]:
+    """Each non-empty line of a buffer."""
+    return (match.group() for match in LINE.finditer(data))
 
 
 @component.hook(1, 1, year=2023)
 def one(input_stream: t.TextIO, output_stream: t.TextIO) -> None:
     """Day 1 Part 1 solution."""
-    lines = core.load_data(input_stream)
-    total = sum(x * 10 + y for x, y in parse_numbers(lines))
+    with core.load_bytes(input_stream) as data:
+        total = sum(x * 10 + y for x, y in map(numeral_digits, lines(data)))
     output_stream.write(f"Total: {total}")
 
 
 @component.hook(1, 2, year=2023)
 def two(input_stream: t.TextIO, output_stream: t.TextIO) -> None:
     """Day 1 Part 2 solution."""
-    lines = core.load_data(input_stream)
-    total = sum(x * 10 + y for x, y in map(find_text_numbers, lines))
+    with core.load_bytes(input_stream) as data:
+        total = sum(x * 10 + y for x, y in map(spelled_digits, lines(data)))
     output_stream.write(f"Total: {total}")
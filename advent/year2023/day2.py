@@ -1,10 +1,10 @@
 """Solution to Day 2 of AoC."""
 
-import collections
+import array
 import dataclasses
-import functools
 import logging
-import math
+import operator
+import re
 import typing as t
 
 from advent import core
@@ -18,92 +18,84 @@ component = core.Component()
 Selection = t.Counter[str]
 
 
-@dataclasses.dataclass(frozen=True)
-class Game:
-    """Model a elf cube color game."""
-
-    id: int
-    reveals: t.Iterable[Selection]
+# Numbers of each colour in a reveal, and the id of a game
+COLOUR_COUNTS = {
+    colour: re.compile(rb"(\d+)\s+" + colour.encode())
+    for colour in ("red", "green", "blue")
+}
+GAME_ID = re.compile(rb"\s*Game\s+(\d+)\s*:")
 
 
-def parse_game(text: str) -> Game:
-    """Parse a description of a game.
+@dataclasses.dataclass(frozen=True)
+class GameColumns:
+    """Games reduced to the most of each colour ever revealed at once.
 
-    E.g. 'Game 1: 3 blue, 4 red; 1 red, 2 green, 6 blue; 2 green'
+    Each field is a column with one entry per game, in input order.
     """
 
-    text_id, reveals_section = text.split(":")
-    game_id: int = int(text_id.split()[1])
-    reveals = (
-        collections.Counter(
-            {
-                color_components[1].strip(): int(color_components[0])
-                for color_components in reveal_components
-            }
-        )
-        for reveal_components in (
-            (color_text.split() for color_text in reveal_text.split(","))
-            for reveal_text in reveals_section.split(";")
+    ids: "array.array[int]"
+    red: "array.array[int]"
+    green: "array.array[int]"
+    blue: "array.array[int]"
+
+    @classmethod
+    def parse(cls, lines: t.Iterable[bytes]) -> "GameColumns":
+        """Parse game descriptions, with one regex scan per colour per line.
+
+        Blank lines are skipped.
+
+        Raises a ValueError for any other line that does not start with a game id.
+        """
+        columns: t.Dict[str, "array.array[int]"] = {
+            name: array.array("q") for name in ("ids", *COLOUR_COUNTS)
+        }
+        for line in lines:
+            if not line.strip():
+                continue
+            game_id = GAME_ID.match(line)
+            if game_id is None:
+                raise ValueError(f"Line is not a game description: {line!r}")
+            columns["ids"].append(int(game_id.group(1)))
+            for colour, pattern in COLOUR_COUNTS.items():
+                columns[colour].append(max(map(int, pattern.findall(line)), default=0))
+        return cls(**columns)
+
+    def valid_ids(self, bag: Selection) -> t.Iterable[int]:
+        """Ids of the games possible with the given bag."""
+        columns = zip(self.ids, self.red, self.green, self.blue)
+        return (
+            game_id
+            for game_id, red, green, blue in columns
+            if red <= bag["red"] and green <= bag["green"] and blue <= bag["blue"]
         )
-    )
 
-    return Game(id=game_id, reveals=reveals)
+    def powers(self) -> t.Iterable[int]:
+        """Power of the minimum bag of each game, the product of its columns.
 
-
-def is_valid_game(game: Game, bag: Selection) -> bool:
-    """Check if a game is valid, based on an overall selection representing an entire bag.
-
-    A game is invalid if any reveal has more of any object than the overall bag.
-    """
-    return all(reveal <= bag for reveal in game.reveals)
+        A colour that is never revealed counts as zero.
+        """
+        return map(operator.mul, map(operator.mul, self.red, self.green), self.blue)
 
 
 @component.hook(2, 1, year=2023)
 def one(input_stream: t.TextIO, output_stream: t.TextIO) -> None:
     """Day 2 Part 1 solution."""
 
-    lines = core.load_data(input_stream)
-
-    # for line in lines:
-    #     game = parse_game(line)
-    #     print(game.id, list(game.reveals), file=output_stream)
+    lines = (line.encode() for line in core.load_data(input_stream))
 
     DAY1_BAG = Selection({"red": 12, "green": 13, "blue": 14})
 
-    total = sum(
-        game.id
-        for game in (parse_game(line) for line in lines)
-        if is_valid_game(game, DAY1_BAG)
-    )
+    total = sum(GameColumns.parse(lines).valid_ids(DAY1_BAG))
 
     print(f"Total: {total}", file=output_stream)
 
 
-def minimum_bag(reveals: t.Iterable[Selection]) -> Selection:
-    """Find the smallest possible bag to make this sequence of reveals possible.
-
-    This is exactly the union of the multisets of the reveals,
-    i.e. the max seen for each colour.
-    """
-
-    # Reduce using union over the reveals iterable;
-    # use an empty Counter as the initial / default value
-    return functools.reduce(
-        lambda accumulator, reveal: accumulator | reveal,
-        reveals,
-        collections.Counter(),
-    )
-
-
 @component.hook(2, 2, year=2023)
 def two(input_stream: t.TextIO, output_stream: t.TextIO) -> None:
     """Day 2 Part 2 solution."""
 
-    lines = core.load_data(input_stream)
+    lines = (line.encode() for line in core.load_data(input_stream))
 
-    total = sum(
-        math.prod(minimum_bag(game.reveals).values())
-        for game in (parse_game(line) for line in lines)
-    )
+    total = sum(GameColumns.parse(lines).powers())
 
     print(f"Sum of powers of sets: {total}", file=output_stream)
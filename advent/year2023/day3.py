@@ -1,7 +1,12 @@
 """Solution to Day 3 of AoC."""
 
+import bisect
+import collections
+import concurrent.futures
 import dataclasses
+import itertools
 import logging
+import os
 import re
 import typing as t
 
@@ -12,17 +17,30 @@ logger = logging.getLogger(__name__)
 # Define component to be imported by main
 component = core.Component()
 
-Coord = t.Tuple[int, int]
+Coord = core.Coord
+
+# Character codes that are not symbols
+NON_SYMBOLS = frozenset(b".0123456789")
+
+# Number id of cells that are not part of any number
+NO_NUMBER = -1
+
+NUMBER = re.compile(r"\d+")
+SYMBOL = re.compile(r"[^.0-9]")
 
 
 @dataclasses.dataclass(frozen=True)
 class EngineSchematic:
     """An engine schematic"""
 
-    # Mapping of left/start locations to numbers
-    # and locations to symbols
+    # Grid of character codes
+    # and mapping of left/start locations to numbers
+    grid: core.Grid
     numbers: t.Mapping[Coord, t.Tuple[int, Coord]]
-    symbols: t.Mapping[Coord, str]
+    # Grid of the id of the number covering each cell, or NO_NUMBER,
+    # where ids index values in the same order as numbers
+    ids: core.Grid
+    values: t.Sequence[int]
 
     @classmethod
     def from_text(cls, lines: t.Iterable[str]) -> "EngineSchematic":
@@ -31,88 +49,246 @@ class EngineSchematic:
         Interprets the text with 0-based indices.
         """
 
-        parsed_lines = (
-            (
-                {
-                    # match.end gives a exlusive bound;
-                    # for our purposes we want the inclusive coordinate
-                    (row, match.start()): (int(match.group()), (row, match.end() - 1))
-                    for match in re.finditer(r"\d+", line)
-                },
-                {
-                    (row, match.start()): match.group()
-                    for match in re.finditer(r"[^.0-9]", line)
-                },
-            )
-            for row, line in enumerate(lines)
+        rows = [line for line in lines if len(line) > 0]
+
+        numbers = {
+            # match.end gives a exlusive bound;
+            # for our purposes we want the inclusive coordinate
+            (row, match.start()): (int(match.group()), (row, match.end() - 1))
+            for row, line in enumerate(rows)
+            for match in NUMBER.finditer(line)
+        }
+
+        grid = core.Grid.from_lines(rows)
+        ids = core.Grid.filled(grid.width, grid.height, NO_NUMBER)
+        for number_id, ((row, start), (_, (_, end))) in enumerate(numbers.items()):
+            for col in range(start, end + 1):
+                ids[row, col] = number_id
+
+        return cls(
+            grid=grid,
+            numbers=numbers,
+            ids=ids,
+            values=[number for number, _ in numbers.values()],
         )
 
-        numbers: t.Mapping[Coord, t.Tuple[int, Coord]] = {}
-        symbols: t.Mapping[Coord, str] = {}
-
-        for line_numbers, line_symbols in parsed_lines:
-            numbers |= line_numbers
-            symbols |= line_symbols
-
-        return cls(numbers=numbers, symbols=symbols)
-
-
-def part_numbers(schematic: EngineSchematic) -> t.Iterable[int]:
+    @property
+    def symbols(self) -> t.Mapping[Coord, str]:
+        """Mapping of locations to symbols."""
+        return {
+            divmod(index, self.grid.width): chr(code)
+            for index, code in enumerate(self.grid.cells)
+            if code not in NON_SYMBOLS
+        }
+
+    def neighbor_ids(self, coord: Coord) -> t.Set[int]:
+        """Ids of the distinct numbers touching a coordinate, even diagonally."""
+        ids = {self.ids[neighbor] for neighbor in self.grid.neighbors(coord)}
+        ids.discard(NO_NUMBER)
+        return ids
+
+
+def part_numbers(
+    schematic: EngineSchematic, rows: t.Optional[range] = None
+) -> t.Iterable[int]:
     """Retrive all the part numbers from a schematic.
 
     A part number is a number adjacent to a symbol,
     even diagonally, at any point along the number.
+
+    If rows is given, only numbers on those rows are included.
     """
 
+    # Probe around each symbol rather than around each number,
+    # so a number touching several symbols is only counted once by id
+    part_ids: t.Set[int] = set()
+    for coord in schematic.symbols:
+        part_ids |= schematic.neighbor_ids(coord)
+    starts = list(schematic.numbers)
     return (
-        number
-        for start, (number, end) in schematic.numbers.items()
-        if any(
-            (row, col) in schematic.symbols
-            for row in (start[0] - 1, start[0], start[0] + 1)
-            # range is end-exclusive so add 1 to the + 1
-            for col in range(start[1] - 1, end[1] + 1 + 1)
-        )
+        schematic.values[number_id]
+        for number_id in sorted(part_ids)
+        if rows is None or starts[number_id][0] in rows
     )
 
 
 def adjacent_numbers(spot: Coord, schematic: EngineSchematic) -> t.Iterable[int]:
     """Find all numbers adjacent to a coordinate."""
-    return (
-        number
-        for start, (number, end) in schematic.numbers.items()
-        if spot
-        in (
-            (row, col)
-            for row in (start[0] - 1, start[0], start[0] + 1)
-            # range is end-exclusive so add 1 to the + 1
-            for col in range(start[1] - 1, end[1] + 1 + 1)
-        )
-    )
+    return (schematic.values[number_id] for number_id in schematic.neighbor_ids(spot))
+
 
+def gears(schematic: EngineSchematic, rows: t.Optional[range] = None) -> t.Iterable[int]:
+    """Find all gear products of the schematic.
 
-def gears(schematic: EngineSchematic) -> t.Iterable[int]:
-    """Find all gear products of the schematic."""
+    If rows is given, only gears on those rows are included.
+    """
     return (
         numbers[0] * numbers[1]
         for numbers in (
             list(adjacent_numbers(coord, schematic))
             for coord, symbol in schematic.symbols.items()
-            if symbol == "*"
+            if symbol == "*" and (rows is None or coord[0] in rows)
         )
         if len(numbers) == 2
     )
 
 
+@dataclasses.dataclass(frozen=True)
+class SchematicRow:
+    """The numbers and symbols of a single row of a schematic."""
+
+    # Numbers as (number, start, exclusive end) spans, left to right
+    numbers: t.Sequence[t.Tuple[int, int, int]]
+    # Columns of every symbol, and of the possible gears among them
+    symbols: t.Sequence[int]
+    stars: t.Sequence[int]
+
+    @classmethod
+    def from_line(cls, line: str) -> "SchematicRow":
+        """Parse a single line of a schematic."""
+        symbols = [match.start() for match in SYMBOL.finditer(line)]
+        return cls(
+            numbers=[
+                (int(match.group()), match.start(), match.end())
+                for match in NUMBER.finditer(line)
+            ],
+            symbols=symbols,
+            stars=[col for col in symbols if line[col] == "*"],
+        )
+
+
+# Stands in for the rows above the first and below the last
+EMPTY_ROW = SchematicRow(numbers=(), symbols=(), stars=())
+
+Window = t.Tuple[SchematicRow, SchematicRow, SchematicRow]
+
+
+def windows(rows: t.Iterable[SchematicRow]) -> t.Iterator[Window]:
+    """Each row together with the rows directly above and below it."""
+    window = collections.deque([EMPTY_ROW], maxlen=3)
+    for row in itertools.chain(rows, [EMPTY_ROW]):
+        window.append(row)
+        if len(window) == 3:
+            yield window[0], window[1], window[2]
+
+
+def touches_symbol(start: int, end: int, row: SchematicRow) -> bool:
+    """Whether a row has a symbol adjacent to the columns from start to end."""
+    # end is exclusive, so it is already the column just after the span
+    index = bisect.bisect_left(row.symbols, start - 1)
+    return index < len(row.symbols) and row.symbols[index] <= end
+
+
+def numbers_touching(col: int, row: SchematicRow) -> t.Iterable[int]:
+    """Numbers of a row adjacent to a column, even diagonally."""
+    index = bisect.bisect_left(row.numbers, col, key=lambda span: span[2])
+    for number, start, _ in itertools.islice(row.numbers, index, None):
+        if start - 1 > col:
+            break
+        yield number
+
+
+def resolve_row(window: Window) -> t.Tuple[int, int]:
+    """Sum the part numbers and gear ratios of the middle row of a window.
+
+    Only numbers and gears in the middle row are counted,
+    so every one is resolved exactly once as the window slides down.
+    """
+    _, row, _ = window
+    parts = sum(
+        number
+        for number, start, end in row.numbers
+        if any(touches_symbol(start, end, other) for other in window)
+    )
+    ratios = 0
+    for col in row.stars:
+        adjacent = [
+            number for other in window for number in numbers_touching(col, other)
+        ]
+        if len(adjacent) == 2:
+            ratios += adjacent[0] * adjacent[1]
+    return parts, ratios
+
+
+def window_totals(windows: t.Iterable[Window]) -> t.Tuple[int, int]:
+    """Sum the part numbers and gear ratios resolved in each window."""
+    parts = ratios = 0
+    for window in windows:
+        row_parts, row_ratios = resolve_row(window)
+        parts += row_parts
+        ratios += row_ratios
+    return parts, ratios
+
+
+def stream_totals(lines: t.Iterable[str]) -> t.Tuple[int, int]:
+    """Sum part numbers and gear ratios of a schematic, row by row.
+
+    Only three rows are held at a time, so memory does not grow with height.
+    """
+    rows = (SchematicRow.from_line(line) for line in lines if len(line) > 0)
+    return window_totals(windows(rows))
+
+
+def band_totals(band: t.Sequence[str], above: str, below: str) -> t.Tuple[int, int]:
+    """Sum part numbers and gear ratios of a band of rows.
+
+    The band and its halo rows are indexed as one EngineSchematic.
+    above and below are the halo rows just outside the band, or empty at an edge.
+    They are only checked for adjacency, since their own numbers and gears
+    belong to the neighbouring bands.
+    """
+    halo_above = [above] if len(above) > 0 else []
+    halo_below = [below] if len(below) > 0 else []
+    schematic = EngineSchematic.from_text([*halo_above, *band, *halo_below])
+    owned = range(len(halo_above), len(halo_above) + len(band))
+    return sum(part_numbers(schematic, owned)), sum(gears(schematic, owned))
+
+
+def chunk_totals(path: str, start: int, end: int) -> t.Tuple[int, int]:
+    """Sum part numbers and gear ratios of the rows starting in a byte range."""
+    above, data, below = core.read_halo_chunk(path, start, end)
+    band = [line.strip() for line in data.decode().splitlines()]
+    return band_totals(
+        [line for line in band if len(line) > 0],
+        above.decode().strip(),
+        below.decode().strip(),
+    )
+
+
+def parallel_totals(path: str, workers: t.Optional[int] = None) -> t.Tuple[int, int]:
+    """Sum part numbers and gear ratios of a schematic file across worker processes.
+
+    The file is split into one byte range of rows per worker,
+    and each worker reads its own band with a single halo row above and below.
+    Every number and gear is owned by the band holding its row,
+    so the partial sums can simply be added together.
+    """
+    size = os.path.getsize(path)
+    workers = workers or os.cpu_count() or 1
+    bounds = [size * index // workers for index in range(workers + 1)]
+    with concurrent.futures.ProcessPoolExecutor(workers) as executor:
+        totals = list(
+            executor.map(chunk_totals, itertools.repeat(path), bounds[:-1], bounds[1:])
+        )
+    return sum(parts for parts, _ in totals), sum(ratios for _, ratios in totals)
+
+
+def schematic_totals(input_stream: t.TextIO) -> t.Tuple[int, int]:
+    """Sum part numbers and gear ratios of a schematic from an input stream.
+
+    Large files are split into bands and processed in parallel.
+    """
+    path = core.parallel_path(input_stream)
+    if path is not None:
+        return parallel_totals(path)
+    return stream_totals(core.load_data(input_stream))
+
+
 @component.hook(3, 1, year=2023)
 def one(input_stream: t.TextIO, output_stream: t.TextIO) -> None:
     """Day 3 Part 1 solution."""
 
-    lines = core.load_data(input_stream)
-
-    schematic = EngineSchematic.from_text(lines)
-
-    total = sum(part_numbers(schematic))
+    total, _ = schematic_totals(input_stream)
 
     print(f"Total: {total}", file=output_stream)
 
@@ -121,10 +297,6 @@ def one(input_stream: t.TextIO, output_stream: t.TextIO) -> None:
 def two(input_stream: t.TextIO, output_stream: t.TextIO) -> None:
     """Day 3 Part 2 solution."""
 
-    lines = core.load_data(input_stream)
-
-    schematic = EngineSchematic.from_text(lines)
-
-    total = sum(gears(schematic))
+    _, total = schematic_totals(input_stream)
 
     print(f"Sum of gear ratios: {total}", file=output_stream)
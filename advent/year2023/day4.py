@@ -31,8 +31,8 @@ def parse_scratchcard(text: str) -> Scratchcard:
     name, info = text.split(":", maxsplit=1)
     card_id = int(name.split()[1].strip())
     winners_text, numbers_text = info.split("|", maxsplit=1)
-    winners = {int(value) for value in winners_text.split()}
-    numbers = (int(value) for value in numbers_text.split())
+    winners = set(core.extract_integers(winners_text.encode()))
+    numbers = core.extract_integers(numbers_text.encode())
 
     return Scratchcard(id=card_id, winners=winners, numbers=numbers)
 
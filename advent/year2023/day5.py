@@ -34,10 +34,7 @@ def parse_alamanc(lines: t.Iterable[str]) -> Almanac:
     """Parse the textual representation of an almanac."""
 
     seeds_text, *mappings_lines = lines
-    seeds = (
-        int(seed_text.strip())
-        for seed_text in seeds_text.split("seeds:", maxsplit=1)[1].split()
-    )
+    seeds = core.extract_integers(seeds_text.encode())
 
     mappings: t.Dict[str, t.List[RangeMapping]] = {}
 
@@ -51,7 +48,7 @@ def parse_alamanc(lines: t.Iterable[str]) -> Almanac:
                 current = mappings[line.split()[0]]
             else:
                 # mapping triple
-                numbers = [int(number_text) for number_text in line.split()]
+                numbers = core.extract_integers(line.encode())
                 current.append((numbers[0], numbers[1], numbers[2]))
 
     return Almanac(